@@ -0,0 +1,86 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+try:
+    import redis
+except ImportError:  # Redis is optional; fall back to the in-process cache only
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class JobStore:
+    """Size-bounded LRU store for processing jobs, optionally shared through Redis.
+
+    The in-process cache keeps hot jobs close to the worker that owns them, while
+    Redis makes every job visible to all workers so status polls never 404 just
+    because they hit a different process.
+    """
+
+    def __init__(self, max_size: int = 1024, redis_url: Optional[str] = None, ttl: int = 86400):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._redis = None
+        if redis_url:
+            if redis is None:
+                logger.warning("REDIS_URL is set but the redis package is not installed, using in-process job store")
+            else:
+                self._redis = redis.Redis.from_url(redis_url)
+
+    def _cache(self, job_id: str, job: Dict[str, Any]):
+        with self._lock:
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            if len(self._jobs) > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used finished jobs until the cache fits in max_size.
+
+        Jobs that are still processing are kept even past max_size, since their
+        worker writes the result back to them later, and so is the job that was
+        just stored. Must hold self._lock.
+        """
+        for old_id in list(self._jobs)[:-1]:
+            if len(self._jobs) <= self.max_size:
+                break
+            if self._jobs[old_id].get("status") != "processing":
+                del self._jobs[old_id]
+
+    def set(self, job_id: str, job: Dict[str, Any]):
+        """Store a job, replacing any previous state."""
+        self._cache(job_id, job)
+        if self._redis is not None:
+            self._redis.set(f"job:{job_id}", json.dumps(job, default=str), ex=self.ttl)
+
+    def update(self, job_id: str, fields: Dict[str, Any]):
+        """Merge `fields` into an existing job; unknown jobs are left alone."""
+        job = self.get(job_id)
+        if job is None:
+            logger.warning(f"Not updating unknown job {job_id}")
+            return
+        job = dict(job)
+        job.update(fields)
+        self.set(job_id, job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by ID, or None if it is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.move_to_end(job_id)
+
+        # Finished jobs never change, so only unknown or in-progress jobs
+        # need to be refreshed from the shared store
+        if self._redis is not None and (job is None or job.get("status") == "processing"):
+            data = self._redis.get(f"job:{job_id}")
+            if data is not None:
+                job = json.loads(data)
+                self._cache(job_id, job)
+
+        return job
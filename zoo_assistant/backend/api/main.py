@@ -1,19 +1,33 @@
 import os
-import shutil
+import asyncio
+import hashlib
+import tempfile
 import logging
+import threading
+import mimetypes
 from typing import List, Dict, Any, Optional
-from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, BackgroundTasks, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, BackgroundTasks, Query, Request
+from fastapi.responses import ORJSONResponse, Response, FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, raiseload
 import uuid
-from datetime import datetime, timedelta
+from urllib.parse import quote
+from datetime import datetime, timedelta, time
+from functools import lru_cache
 from pydantic import BaseModel
+from cachetools import TTLCache
+import orjson
 
 # Import our modules
 from ...core_engine.processing_pipeline import get_pipeline
-from ...core_engine.db.database import get_db
-from ...core_engine.db.models import Animal, Observation, Measurement, Feeding, EntityConfig, Base, engine
+from ...core_engine.db.database import get_db, SessionLocal
+from .jobs import JobStore
+from ...core_engine.db.models import Animal, Observation, Measurement, Feeding, EntityConfig, Base, engine, utcnow
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -26,18 +40,31 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Zoo Assistant API",
     description="API for processing and managing zoo animal observations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Origins allowed to call the API from a browser
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:8000,http://localhost:8080").split(",")
+    if origin.strip()
+]
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
+# Compress larger JSON responses (list endpoints, reports)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Define models for API
 class EntityConfigModel(BaseModel):
     entity_type: str
@@ -72,40 +99,126 @@ class ObservationResponse(BaseModel):
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# In-memory storage for processing jobs
-processing_jobs = {}
+# Internal nginx location that serves UPLOAD_DIR; when set, audio downloads are
+# handed off to nginx with X-Accel-Redirect instead of streamed by the worker
+X_ACCEL_REDIRECT_PREFIX = os.getenv("X_ACCEL_REDIRECT_PREFIX")
+
+# Size of the chunks used to stream uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Process umask, read once so stored uploads get regular file permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Short-lived cache of pre-serialized responses for small, rarely-changing endpoints
+RESPONSE_CACHE_TTL = 30  # seconds
+response_cache = TTLCache(maxsize=128, ttl=RESPONSE_CACHE_TTL)
+response_cache_lock = threading.Lock()
+
+def _cached_json(key: str, build) -> Response:
+    """Return the cached JSON body for `key`, building and caching it on a miss."""
+    with response_cache_lock:
+        content = response_cache.get(key)
+    if content is None:
+        content = orjson.dumps(build())
+        with response_cache_lock:
+            response_cache[key] = content
+    return Response(content=content, media_type="application/json")
+
+def _invalidate_cache(key: str):
+    """Drop a cached response so the next request re-queries the database."""
+    with response_cache_lock:
+        response_cache.pop(key, None)
+
+# Storage for processing jobs, shared across workers when REDIS_URL is set
+processing_jobs = JobStore(
+    max_size=int(os.getenv("JOB_CACHE_SIZE", "1024")),
+    redis_url=os.getenv("REDIS_URL")
+)
+
+@app.on_event("startup")
+async def warm_pipeline():
+    """Load the ASR and NER models at startup so the first upload doesn't pay for it."""
+    try:
+        await run_in_threadpool(get_pipeline().warm_up)
+    except Exception as e:
+        logger.error(f"Error warming up processing pipeline: {str(e)}")
 
 @app.get("/")
 async def root():
     """Root endpoint to check if API is running."""
     return {"message": "Zoo Assistant API is running"}
 
-@app.post("/api/audio/process", response_model=AudioProcessResponse)
+def _is_safe_filename(filename: Optional[str]) -> bool:
+    """Check that a client-supplied file name cannot escape the upload directory."""
+    if not filename or filename.startswith("."):
+        return False
+    return not any(c in filename for c in ("/", "\\", "\0"))
+
+def _upload_path(filename: str) -> str:
+    """Path of a stored upload, fanned out by the first two characters of its hash."""
+    return os.path.join(UPLOAD_DIR, filename[:2], filename)
+
+def _save_upload(src, filename: str) -> str:
+    """Copy an uploaded file to a content-addressed path and return it.
+
+    Identical uploads are stored once under the SHA-256 of their content.
+    """
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR)
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                buffer.write(chunk)
+            # mkstemp creates the file 0600; give it regular permissions so
+            # nginx can serve it when X_ACCEL_REDIRECT_PREFIX is set
+            os.fchmod(buffer.fileno(), 0o666 & ~_UMASK)
+        
+        file_path = _upload_path(digest.hexdigest() + os.path.splitext(filename)[1].lower())
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        # Don't leave partial uploads behind in UPLOAD_DIR
+        os.unlink(tmp_path)
+        raise
+    return file_path
+
+# Seconds clients should wait between job status polls
+STATUS_POLL_INTERVAL = 2
+
+@app.post("/api/audio/process", response_model=AudioProcessResponse, status_code=202)
 async def process_audio(
+    request: Request,
+    response: Response,
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    file: UploadFile = File(...)
 ):
     """Process an audio file containing zoo observations."""
     # Generate a unique ID for this job
     job_id = str(uuid.uuid4())
     
-    # Save the uploaded file
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    if not _is_safe_filename(file.filename):
+        raise HTTPException(status_code=400, detail="Invalid file name")
+    
+    # Save the uploaded file off the event loop in a single threadpool hop
+    file_path = await run_in_threadpool(_save_upload, file.file, file.filename)
     
-    # Create a job entry
-    processing_jobs[job_id] = {
+    # Create a job entry; the job store may be backed by Redis, so write it off the event loop
+    await run_in_threadpool(processing_jobs.set, job_id, {
         "id": job_id,
         "status": "processing",
         "file_name": file.filename,
         "file_path": file_path,
         "start_time": datetime.utcnow()
-    }
+    })
     
     # Process the audio in the background
-    background_tasks.add_task(process_audio_task, job_id, file_path, db)
+    background_tasks.add_task(process_audio_task, job_id, file_path)
+    
+    # Point clients at the status resource to poll
+    response.headers["Location"] = str(request.url_for("get_audio_status", job_id=job_id))
+    response.headers["Retry-After"] = str(STATUS_POLL_INTERVAL)
     
     return AudioProcessResponse(
         id=job_id,
@@ -113,7 +226,7 @@ async def process_audio(
         file_name=file.filename
     )
 
-async def process_audio_task(job_id: str, file_path: str, db: Session):
+def process_audio_task(job_id: str, file_path: str):
     """Background task to process audio."""
     try:
         # Get the processing pipeline
@@ -124,9 +237,10 @@ async def process_audio_task(job_id: str, file_path: str, db: Session):
         
         # Save to database
         db_result = pipeline.save_to_database(result)
+        _invalidate_cache("animals")
         
         # Update job status
-        processing_jobs[job_id].update({
+        processing_jobs.update(job_id, {
             "status": "completed",
             "transcription": result.transcription,
             "processing_time": result.processing_time,
@@ -137,97 +251,150 @@ async def process_audio_task(job_id: str, file_path: str, db: Session):
         
     except Exception as e:
         logger.error(f"Error processing audio: {str(e)}")
-        processing_jobs[job_id].update({
+        processing_jobs.update(job_id, {
             "status": "failed",
             "error": str(e)
         })
 
 @app.get("/api/audio/status/{job_id}", response_model=AudioProcessResponse)
-async def get_audio_status(job_id: str):
+def get_audio_status(job_id: str):
     """Get the status of an audio processing job."""
-    if job_id not in processing_jobs:
+    job = processing_jobs.get(job_id) or {}
+    if job.get("id") is None or job.get("status") is None or job.get("file_name") is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = processing_jobs[job_id]
     return AudioProcessResponse(
-        id=job["id"],
-        status=job["status"],
-        file_name=job["file_name"],
+        id=job.get("id"),
+        status=job.get("status"),
+        file_name=job.get("file_name"),
         transcription=job.get("transcription"),
         processing_time=job.get("processing_time"),
         entities=job.get("entities"),
         structured_data=job.get("structured_data")
     )
 
+# Seconds between job store checks while streaming status events
+STATUS_EVENT_INTERVAL = 0.25
+
+async def _job_events(job_id: str):
+    """Yield a Server-Sent Event each time the job's status changes, until it finishes."""
+    last_status = None
+    while True:
+        # The job store may be backed by Redis, so read it off the event loop
+        status = await run_in_threadpool(get_audio_status, job_id)
+        if status.status != last_status:
+            last_status = status.status
+            yield b"data: " + status.model_dump_json().encode() + b"\n\n"
+        if last_status != "processing":
+            return
+        await asyncio.sleep(STATUS_EVENT_INTERVAL)
+
+@app.get("/api/audio/events/{job_id}")
+def get_audio_events(job_id: str):
+    """Stream status updates of an audio processing job as Server-Sent Events."""
+    if processing_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return StreamingResponse(
+        _job_events(job_id),
+        media_type="text/event-stream",
+        # identity encoding keeps GZipMiddleware from buffering events
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/audio/files/{filename}")
+async def get_audio_file(filename: str):
+    """Download an uploaded audio file."""
+    if not _is_safe_filename(filename):
+        raise HTTPException(status_code=400, detail="Invalid file name")
+    
+    file_path = _upload_path(filename)
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    if X_ACCEL_REDIRECT_PREFIX:
+        # Let nginx stream the file with sendfile instead of pinning a worker
+        return Response(
+            media_type=media_type,
+            headers={"X-Accel-Redirect": f"{X_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quote(filename[:2])}/{quote(filename)}"}
+        )
+    
+    return FileResponse(file_path, media_type=media_type)
+
 @app.get("/api/transcriptions", response_model=List[ObservationResponse])
-async def get_transcriptions(
+def get_transcriptions(
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     db: Session = Depends(get_db)
 ):
     """Get a list of transcriptions."""
     observations = db.query(
-        Observation, Animal.name, Animal.species
+        Observation.id,
+        Observation.animal_id,
+        Animal.name.label("animal_name"),
+        Animal.species.label("animal_species"),
+        Observation.behavior,
+        Observation.health_status,
+        Observation.notes,
+        Observation.timestamp,
+        Observation.audio_file,
+        Observation.transcription
     ).join(
         Animal, Observation.animal_id == Animal.id
     ).order_by(
         Observation.timestamp.desc()
     ).offset(offset).limit(limit).all()
     
-    return [
-        ObservationResponse(
-            id=obs.Observation.id,
-            animal_id=obs.Observation.animal_id,
-            animal_name=obs.name,
-            animal_species=obs.species,
-            behavior=obs.Observation.behavior,
-            health_status=obs.Observation.health_status,
-            notes=obs.Observation.notes,
-            timestamp=obs.Observation.timestamp,
-            audio_file=obs.Observation.audio_file,
-            transcription=obs.Observation.transcription
-        )
-        for obs in observations
-    ]
+    total = db.query(func.count(Observation.id)).join(
+        Animal, Observation.animal_id == Animal.id
+    ).scalar()
+    
+    # Rows come straight from the database, so skip response model validation
+    return ORJSONResponse(
+        [row._asdict() for row in observations],
+        headers={"X-Total-Count": str(total)}
+    )
 
 @app.get("/api/animals", response_model=List[Dict[str, Any]])
-async def get_animals(db: Session = Depends(get_db)):
+def get_animals(db: Session = Depends(get_db)):
     """Get a list of all animals."""
-    animals = db.query(Animal).all()
-    return [
-        {
-            "id": animal.id,
-            "name": animal.name,
-            "species": animal.species,
-            "age": animal.age,
-            "enclosure": animal.enclosure
-        }
-        for animal in animals
-    ]
+    def build():
+        animals = db.query(
+            Animal.id, Animal.name, Animal.species, Animal.age, Animal.enclosure
+        ).all()
+        return [animal._asdict() for animal in animals]
+    return _cached_json("animals", build)
+
+def _latest_id(model):
+    """Correlated subquery selecting the id of the newest row of `model` for an animal."""
+    return select(model.id).where(
+        model.animal_id == Animal.id
+    ).order_by(model.timestamp.desc()).limit(1).correlate(Animal).scalar_subquery()
 
 @app.get("/api/animals/{animal_id}", response_model=Dict[str, Any])
-async def get_animal(animal_id: int, db: Session = Depends(get_db)):
+def get_animal(animal_id: int, db: Session = Depends(get_db)):
     """Get details for a specific animal."""
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
-    if not animal:
-        raise HTTPException(status_code=404, detail="Animal not found")
-    
-    # Get the latest observation
-    latest_observation = db.query(Observation).filter(
-        Observation.animal_id == animal_id
-    ).order_by(Observation.timestamp.desc()).first()
+    # Fetch the animal together with its latest observation, measurement and
+    # feeding in a single round-trip
+    row = db.query(
+        Animal, Observation, Measurement, Feeding
+    ).outerjoin(
+        Observation, Observation.id == _latest_id(Observation)
+    ).outerjoin(
+        Measurement, Measurement.id == _latest_id(Measurement)
+    ).outerjoin(
+        Feeding, Feeding.id == _latest_id(Feeding)
+    ).options(
+        raiseload("*")
+    ).filter(Animal.id == animal_id).first()
     
-    # Get the latest measurement
-    latest_measurement = db.query(Measurement).filter(
-        Measurement.animal_id == animal_id
-    ).order_by(Measurement.timestamp.desc()).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Animal not found")
     
-    # Get the latest feeding
-    latest_feeding = db.query(Feeding).filter(
-        Feeding.animal_id == animal_id
-    ).order_by(Feeding.timestamp.desc()).first()
+    animal, latest_observation, latest_measurement, latest_feeding = row
     
-    return {
+    return ORJSONResponse({
         "id": animal.id,
         "name": animal.name,
         "species": animal.species,
@@ -251,10 +418,10 @@ async def get_animal(animal_id: int, db: Session = Depends(get_db)):
             "quantity": latest_feeding.quantity if latest_feeding else None,
             "timestamp": latest_feeding.timestamp if latest_feeding else None
         }
-    }
+    })
 
 @app.get("/api/animals/{animal_id}/log", response_model=List[Dict[str, Any]])
-async def get_animal_log(
+def get_animal_log(
     animal_id: int,
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
@@ -262,157 +429,162 @@ async def get_animal_log(
 ):
     """Get observation log for a specific animal."""
     # Check if animal exists
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = db.query(Animal.id).filter(Animal.id == animal_id).first()
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     
     # Get observations
-    observations = db.query(Observation).filter(
+    observations = db.query(
+        Observation.id,
+        Observation.behavior,
+        Observation.health_status,
+        Observation.notes,
+        Observation.timestamp,
+        Observation.audio_file,
+        Observation.transcription
+    ).filter(
         Observation.animal_id == animal_id
     ).order_by(Observation.timestamp.desc()).offset(offset).limit(limit).all()
     
-    return [
-        {
-            "id": obs.id,
-            "behavior": obs.behavior,
-            "health_status": obs.health_status,
-            "notes": obs.notes,
-            "timestamp": obs.timestamp,
-            "audio_file": obs.audio_file,
-            "transcription": obs.transcription
-        }
-        for obs in observations
-    ]
+    total = db.query(func.count(Observation.id)).filter(Observation.animal_id == animal_id).scalar()
+    
+    return ORJSONResponse(
+        [row._asdict() for row in observations],
+        headers={"X-Total-Count": str(total)}
+    )
+
+@lru_cache(maxsize=128)
+def _parse_report_date(value: str):
+    """Parse a YYYY-MM-DD report date."""
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+# Columns returned for each section of the daily report
+DAILY_REPORT_COLUMNS = {
+    Observation: (Observation.behavior, Observation.health_status, Observation.timestamp),
+    Measurement: (Measurement.weight, Measurement.length, Measurement.temperature, Measurement.timestamp),
+    Feeding: (Feeding.food_type, Feeding.quantity, Feeding.timestamp)
+}
+
+def _daily_rows(model, start_date, end_date, limit, offset):
+    """Build a query returning a page of `model` rows joined with their animal for a date range."""
+    def query(db: Session):
+        return db.query(
+            model.id,
+            Animal.name.label("animal_name"),
+            Animal.species.label("animal_species"),
+            *DAILY_REPORT_COLUMNS[model]
+        ).join(
+            Animal, model.animal_id == Animal.id
+        ).filter(
+            model.timestamp >= start_date,
+            model.timestamp < end_date
+        ).order_by(model.timestamp).offset(offset).limit(limit).all()
+    return query
+
+def _daily_count(model, start_date, end_date):
+    """Build a query counting `model` rows for a date range."""
+    def query(db: Session):
+        return db.query(func.count(model.id)).filter(
+            model.timestamp >= start_date,
+            model.timestamp < end_date
+        ).scalar()
+    return query
+
+async def _run_in_session(query):
+    """Run a blocking query in the threadpool with its own session."""
+    def run():
+        db = SessionLocal()
+        try:
+            return query(db)
+        finally:
+            db.close()
+    return await run_in_threadpool(run)
 
 @app.get("/api/reports/daily", response_model=Dict[str, Any])
 async def get_daily_report(
     date: Optional[str] = None,
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0)
 ):
     """Get a daily report of observations."""
     # Parse date or use today
     if date:
         try:
-            report_date = datetime.strptime(date, "%Y-%m-%d").date()
+            report_date = _parse_report_date(date)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
     else:
         report_date = datetime.utcnow().date()
     
-    # Get start and end of the day
-    start_date = datetime.combine(report_date, datetime.min.time())
-    end_date = datetime.combine(report_date, datetime.max.time())
+    # Get the half-open [start, end) range of the day
+    start_date = datetime.combine(report_date, time.min)
+    end_date = start_date + timedelta(days=1)
     
-    # Get observations for the day
-    observations = db.query(
-        Observation, Animal.name, Animal.species
-    ).join(
-        Animal, Observation.animal_id == Animal.id
-    ).filter(
-        Observation.timestamp >= start_date,
-        Observation.timestamp <= end_date
-    ).order_by(Observation.timestamp).all()
-    
-    # Get measurements for the day
-    measurements = db.query(
-        Measurement, Animal.name, Animal.species
-    ).join(
-        Animal, Measurement.animal_id == Animal.id
-    ).filter(
-        Measurement.timestamp >= start_date,
-        Measurement.timestamp <= end_date
-    ).order_by(Measurement.timestamp).all()
-    
-    # Get feedings for the day
-    feedings = db.query(
-        Feeding, Animal.name, Animal.species
-    ).join(
-        Animal, Feeding.animal_id == Animal.id
-    ).filter(
-        Feeding.timestamp >= start_date,
-        Feeding.timestamp <= end_date
-    ).order_by(Feeding.timestamp).all()
+    # Fetch a page of observations, measurements and feedings for the day,
+    # along with their total counts, concurrently
+    (
+        observations, measurements, feedings,
+        observations_count, measurements_count, feedings_count
+    ) = await asyncio.gather(
+        _run_in_session(_daily_rows(Observation, start_date, end_date, limit, offset)),
+        _run_in_session(_daily_rows(Measurement, start_date, end_date, limit, offset)),
+        _run_in_session(_daily_rows(Feeding, start_date, end_date, limit, offset)),
+        _run_in_session(_daily_count(Observation, start_date, end_date)),
+        _run_in_session(_daily_count(Measurement, start_date, end_date)),
+        _run_in_session(_daily_count(Feeding, start_date, end_date))
+    )
     
-    return {
-        "date": report_date.isoformat(),
-        "observations_count": len(observations),
-        "observations": [
-            {
-                "id": obs.Observation.id,
-                "animal_name": obs.name,
-                "animal_species": obs.species,
-                "behavior": obs.Observation.behavior,
-                "health_status": obs.Observation.health_status,
-                "timestamp": obs.Observation.timestamp
-            }
-            for obs in observations
-        ],
-        "measurements_count": len(measurements),
-        "measurements": [
-            {
-                "id": m.Measurement.id,
-                "animal_name": m.name,
-                "animal_species": m.species,
-                "weight": m.Measurement.weight,
-                "length": m.Measurement.length,
-                "temperature": m.Measurement.temperature,
-                "timestamp": m.Measurement.timestamp
-            }
-            for m in measurements
-        ],
-        "feedings_count": len(feedings),
-        "feedings": [
-            {
-                "id": f.Feeding.id,
-                "animal_name": f.name,
-                "animal_species": f.species,
-                "food_type": f.Feeding.food_type,
-                "quantity": f.Feeding.quantity,
-                "timestamp": f.Feeding.timestamp
-            }
-            for f in feedings
-        ]
-    }
+    return ORJSONResponse({
+        "date": report_date,
+        "observations_count": observations_count,
+        "observations": [obs._asdict() for obs in observations],
+        "measurements_count": measurements_count,
+        "measurements": [m._asdict() for m in measurements],
+        "feedings_count": feedings_count,
+        "feedings": [f._asdict() for f in feedings]
+    })
 
 @app.get("/api/entities/config", response_model=List[EntityConfigModel])
-async def get_entity_configs(db: Session = Depends(get_db)):
+def get_entity_configs(db: Session = Depends(get_db)):
     """Get entity extraction configurations."""
-    configs = db.query(EntityConfig).all()
-    return [
-        EntityConfigModel(
-            entity_type=config.entity_type,
-            is_active=config.is_active,
-            priority=config.priority
-        )
-        for config in configs
-    ]
+    def build():
+        configs = db.query(
+            EntityConfig.entity_type, EntityConfig.is_active, EntityConfig.priority
+        ).all()
+        return [config._asdict() for config in configs]
+    return _cached_json("entity_configs", build)
+
+# Dialect-specific INSERT constructs supporting ON CONFLICT DO UPDATE
+_DIALECT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert
+}
 
 @app.post("/api/entities/config", response_model=EntityConfigModel)
-async def update_entity_config(
+def update_entity_config(
     config: EntityConfigModel,
     db: Session = Depends(get_db)
 ):
     """Update entity extraction configuration."""
-    # Check if config exists
-    db_config = db.query(EntityConfig).filter(
-        EntityConfig.entity_type == config.entity_type
-    ).first()
-    
-    if db_config:
-        # Update existing config
-        db_config.is_active = config.is_active
-        db_config.priority = config.priority
-    else:
-        # Create new config
-        db_config = EntityConfig(
-            entity_type=config.entity_type,
-            is_active=config.is_active,
-            priority=config.priority
-        )
-        db.add(db_config)
+    # Insert or update the config in a single statement
+    upsert = _DIALECT_INSERTS[db.get_bind().dialect.name]
+    stmt = upsert(EntityConfig).values(
+        entity_type=config.entity_type,
+        is_active=config.is_active,
+        priority=config.priority
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EntityConfig.entity_type],
+        set_={
+            "is_active": stmt.excluded.is_active,
+            "priority": stmt.excluded.priority,
+            "updated_at": utcnow()
+        }
+    ).returning(EntityConfig.entity_type, EntityConfig.is_active, EntityConfig.priority)
     
+    db_config = db.execute(stmt).one()
     db.commit()
-    db.refresh(db_config)
+    _invalidate_cache("entity_configs")
     
     return EntityConfigModel(
         entity_type=db_config.entity_type,
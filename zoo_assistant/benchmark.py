@@ -7,16 +7,40 @@ import sys
 import time
 import argparse
 import logging
-import statistics
+import tempfile
+import wave
+from contextlib import contextmanager
 from pprint import pprint
 import concurrent.futures
-import matplotlib.pyplot as plt
 import numpy as np
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+@contextmanager
+def prepared_audio(recognizer, audio_files):
+    """Convert each audio file to WAV once and yield {audio_file: (wav_path, audio_duration)}.
+
+    Temporary WAV files are removed on exit.
+    """
+    prepared = {}
+    try:
+        for audio_file in audio_files:
+            wav_path = audio_file
+            if not recognizer.is_compatible_wav(audio_file):
+                fd, wav_path = tempfile.mkstemp(suffix='.wav')
+                os.close(fd)
+                recognizer.convert_to_wav(audio_file, wav_path)
+            with wave.open(wav_path, 'rb') as wf:
+                audio_duration = wf.getnframes() / wf.getframerate()
+            prepared[audio_file] = (wav_path, audio_duration)
+        yield prepared
+    finally:
+        for audio_file, (wav_path, _) in prepared.items():
+            if wav_path != audio_file:
+                os.remove(wav_path)
+
 def benchmark_asr(audio_files, num_runs=3):
     """Benchmark the ASR (Automatic Speech Recognition) component."""
     logger.info(f"Benchmarking ASR with {len(audio_files)} audio files, {num_runs} runs each")
@@ -29,47 +53,49 @@ def benchmark_asr(audio_files, num_runs=3):
         
         results = {}
         
-        for audio_file in audio_files:
-            logger.info(f"Testing file: {audio_file}")
-            file_results = []
-            
-            for run in range(num_runs):
-                logger.info(f"Run {run + 1}/{num_runs}")
+        with prepared_audio(recognizer, audio_files) as prepared:
+            for audio_file in audio_files:
+                logger.info(f"Testing file: {audio_file}")
+                wav_path, audio_duration = prepared[audio_file]
+                file_results = []
+                run_metrics = np.empty((num_runs, 2), dtype=np.float64)
                 
-                # Process the audio file
-                start_time = time.time()
-                result = recognizer.process_audio(audio_file)
-                end_time = time.time()
+                for run in range(num_runs):
+                    logger.info("Run %d/%d", run + 1, num_runs)
+                    
+                    # Process the audio file
+                    start_time = time.perf_counter_ns()
+                    result = recognizer.transcribe_file(wav_path)
+                    end_time = time.perf_counter_ns()
+                    
+                    # Calculate metrics
+                    processing_time = (end_time - start_time) / 1e9
+                    rtf = processing_time / audio_duration
+                    
+                    file_results.append({
+                        'processing_time': processing_time,
+                        'audio_duration': audio_duration,
+                        'rtf': rtf
+                    })
+                    run_metrics[run] = (processing_time, rtf)
+                    
+                    logger.info("Processing time: %.2fs", processing_time)
+                    logger.info("Audio duration: %.2fs", audio_duration)
+                    logger.info("Real-time factor: %.2fx", rtf)
                 
-                # Calculate metrics
-                processing_time = end_time - start_time
-                audio_duration = result.audio_duration
-                rtf = processing_time / audio_duration
+                # Calculate average metrics
+                avg_processing_time, avg_rtf = run_metrics.mean(axis=0)
                 
-                file_results.append({
-                    'processing_time': processing_time,
-                    'audio_duration': audio_duration,
-                    'rtf': rtf
-                })
+                results[os.path.basename(audio_file)] = {
+                    'runs': file_results,
+                    'avg_processing_time': avg_processing_time,
+                    'avg_rtf': avg_rtf,
+                    'audio_duration': audio_duration
+                }
                 
-                logger.info(f"Processing time: {processing_time:.2f}s")
-                logger.info(f"Audio duration: {audio_duration:.2f}s")
-                logger.info(f"Real-time factor: {rtf:.2f}x")
-            
-            # Calculate average metrics
-            avg_processing_time = statistics.mean([r['processing_time'] for r in file_results])
-            avg_rtf = statistics.mean([r['rtf'] for r in file_results])
-            
-            results[os.path.basename(audio_file)] = {
-                'runs': file_results,
-                'avg_processing_time': avg_processing_time,
-                'avg_rtf': avg_rtf,
-                'audio_duration': file_results[0]['audio_duration']
-            }
+                logger.info(f"Average processing time: {avg_processing_time:.2f}s")
+                logger.info(f"Average real-time factor: {avg_rtf:.2f}x")
             
-            logger.info(f"Average processing time: {avg_processing_time:.2f}s")
-            logger.info(f"Average real-time factor: {avg_rtf:.2f}x")
-        
         return results
     
     except Exception as e:
@@ -91,19 +117,20 @@ def benchmark_ner(texts, num_runs=3):
         for i, text in enumerate(texts):
             logger.info(f"Testing text {i + 1}/{len(texts)}")
             text_results = []
+            run_metrics = np.empty((num_runs, 4), dtype=np.float64)
             
             for run in range(num_runs):
-                logger.info(f"Run {run + 1}/{num_runs}")
+                logger.info("Run %d/%d", run + 1, num_runs)
                 
                 # Extract entities
-                start_time = time.time()
+                start_time = time.perf_counter_ns()
                 entities = extractor.extract_entities(text)
-                entity_time = time.time() - start_time
+                entity_time = (time.perf_counter_ns() - start_time) / 1e9
                 
                 # Extract structured data
-                start_time = time.time()
+                start_time = time.perf_counter_ns()
                 structured_data = extractor.extract_animal_info(text)
-                structured_time = time.time() - start_time
+                structured_time = (time.perf_counter_ns() - start_time) / 1e9
                 
                 total_time = entity_time + structured_time
                 
@@ -113,17 +140,15 @@ def benchmark_ner(texts, num_runs=3):
                     'total_time': total_time,
                     'num_entities': len(entities)
                 })
+                run_metrics[run] = (entity_time, structured_time, total_time, len(entities))
                 
-                logger.info(f"Entity extraction time: {entity_time:.2f}s")
-                logger.info(f"Structured data extraction time: {structured_time:.2f}s")
-                logger.info(f"Total time: {total_time:.2f}s")
-                logger.info(f"Found {len(entities)} entities")
+                logger.info("Entity extraction time: %.2fs", entity_time)
+                logger.info("Structured data extraction time: %.2fs", structured_time)
+                logger.info("Total time: %.2fs", total_time)
+                logger.info("Found %d entities", len(entities))
             
             # Calculate average metrics
-            avg_entity_time = statistics.mean([r['entity_time'] for r in text_results])
-            avg_structured_time = statistics.mean([r['structured_time'] for r in text_results])
-            avg_total_time = statistics.mean([r['total_time'] for r in text_results])
-            avg_num_entities = statistics.mean([r['num_entities'] for r in text_results])
+            avg_entity_time, avg_structured_time, avg_total_time, avg_num_entities = run_metrics.mean(axis=0)
             
             results[f"text_{i + 1}"] = {
                 'runs': text_results,
@@ -156,89 +181,108 @@ def benchmark_pipeline(audio_files, num_runs=3):
         
         results = {}
         
-        for audio_file in audio_files:
-            logger.info(f"Testing file: {audio_file}")
-            file_results = []
-            
-            for run in range(num_runs):
-                logger.info(f"Run {run + 1}/{num_runs}")
+        with prepared_audio(pipeline.recognizer, audio_files) as prepared:
+            for audio_file in audio_files:
+                logger.info(f"Testing file: {audio_file}")
+                wav_path, audio_duration = prepared[audio_file]
+                file_results = []
+                run_metrics = np.empty((num_runs, 3), dtype=np.float64)
                 
-                # Process the audio file
-                start_time = time.time()
-                result = pipeline.process_audio(audio_file)
-                end_time = time.time()
+                for run in range(num_runs):
+                    logger.info("Run %d/%d", run + 1, num_runs)
+                    
+                    # Process the audio file
+                    start_time = time.perf_counter_ns()
+                    result = pipeline.process_audio(wav_path)
+                    end_time = time.perf_counter_ns()
+                    
+                    # Calculate metrics
+                    processing_time = (end_time - start_time) / 1e9
+                    rtf = processing_time / audio_duration
+                    
+                    file_results.append({
+                        'processing_time': processing_time,
+                        'audio_duration': audio_duration,
+                        'rtf': rtf,
+                        'num_entities': len(result.entities)
+                    })
+                    run_metrics[run] = (processing_time, rtf, len(result.entities))
+                    
+                    logger.info("Processing time: %.2fs", processing_time)
+                    logger.info("Audio duration: %.2fs", audio_duration)
+                    logger.info("Real-time factor: %.2fx", rtf)
+                    logger.info("Found %d entities", len(result.entities))
                 
-                # Calculate metrics
-                processing_time = end_time - start_time
-                audio_duration = result.audio_duration
-                rtf = processing_time / audio_duration
+                # Calculate average metrics
+                avg_processing_time, avg_rtf, avg_num_entities = run_metrics.mean(axis=0)
                 
-                file_results.append({
-                    'processing_time': processing_time,
-                    'audio_duration': audio_duration,
-                    'rtf': rtf,
-                    'num_entities': len(result.entities)
-                })
+                results[os.path.basename(audio_file)] = {
+                    'runs': file_results,
+                    'avg_processing_time': avg_processing_time,
+                    'avg_rtf': avg_rtf,
+                    'avg_num_entities': avg_num_entities,
+                    'audio_duration': audio_duration
+                }
                 
-                logger.info(f"Processing time: {processing_time:.2f}s")
-                logger.info(f"Audio duration: {audio_duration:.2f}s")
-                logger.info(f"Real-time factor: {rtf:.2f}x")
-                logger.info(f"Found {len(result.entities)} entities")
-            
-            # Calculate average metrics
-            avg_processing_time = statistics.mean([r['processing_time'] for r in file_results])
-            avg_rtf = statistics.mean([r['rtf'] for r in file_results])
-            avg_num_entities = statistics.mean([r['num_entities'] for r in file_results])
+                logger.info(f"Average processing time: {avg_processing_time:.2f}s")
+                logger.info(f"Average real-time factor: {avg_rtf:.2f}x")
             
-            results[os.path.basename(audio_file)] = {
-                'runs': file_results,
-                'avg_processing_time': avg_processing_time,
-                'avg_rtf': avg_rtf,
-                'avg_num_entities': avg_num_entities,
-                'audio_duration': file_results[0]['audio_duration']
-            }
-            
-            logger.info(f"Average processing time: {avg_processing_time:.2f}s")
-            logger.info(f"Average real-time factor: {avg_rtf:.2f}x")
-        
         return results
     
     except Exception as e:
         logger.error(f"Error benchmarking pipeline: {str(e)}")
         return None
 
+def _init_parallel_worker():
+    """Load the processing pipeline once per worker process."""
+    from core_engine.processing_pipeline import get_pipeline
+    get_pipeline().warm_up()
+
+def _process_one(audio_file):
+    """Process a single audio file in a worker process and return its metrics."""
+    from core_engine.processing_pipeline import get_pipeline
+    
+    result = get_pipeline().process_audio(audio_file)
+    return {
+        'processing_time': result.processing_time,
+        'audio_duration': result.audio_duration,
+        'rtf': result.processing_time / result.audio_duration,
+        'num_entities': len(result.entities)
+    }
+
+def _try_process_one(audio_file):
+    """Run _process_one, returning (True, metrics) or (False, error message) instead of raising."""
+    try:
+        return True, _process_one(audio_file)
+    except Exception as e:
+        return False, str(e)
+
 def benchmark_parallel_processing(audio_files, max_workers=None):
     """Benchmark parallel processing of multiple audio files."""
     logger.info(f"Benchmarking parallel processing with {len(audio_files)} audio files")
     
     try:
-        from core_engine.processing_pipeline import get_pipeline
+        # Process files in parallel. ASR and NER are CPU-bound, so use
+        # processes rather than threads to get past the GIL
+        start_time = time.perf_counter_ns()
         
-        # Get the pipeline
-        pipeline = get_pipeline()
+        max_workers = max_workers or os.cpu_count()
+        # Hand files to the workers in batches to cut per-task dispatch overhead
+        chunksize = max(1, len(audio_files) // (4 * max_workers))
         
-        # Process files in parallel
-        start_time = time.time()
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_file = {executor.submit(pipeline.process_audio, audio_file): audio_file for audio_file in audio_files}
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers,
+                                                    initializer=_init_parallel_worker) as executor:
+            outcomes = executor.map(_try_process_one, audio_files, chunksize=chunksize)
             results = {}
             
-            for future in concurrent.futures.as_completed(future_to_file):
-                audio_file = future_to_file[future]
-                try:
-                    result = future.result()
-                    results[os.path.basename(audio_file)] = {
-                        'processing_time': result.processing_time,
-                        'audio_duration': result.audio_duration,
-                        'rtf': result.processing_time / result.audio_duration,
-                        'num_entities': len(result.entities)
-                    }
-                    logger.info(f"Processed {audio_file}: {result.processing_time:.2f}s, RTF: {result.processing_time / result.audio_duration:.2f}x")
-                except Exception as e:
-                    logger.error(f"Error processing {audio_file}: {str(e)}")
+            for audio_file, (ok, file_result) in zip(audio_files, outcomes):
+                if ok:
+                    results[os.path.basename(audio_file)] = file_result
+                    logger.info("Processed %s: %.2fs, RTF: %.2fx", audio_file, file_result['processing_time'], file_result['rtf'])
+                else:
+                    logger.error(f"Error processing {audio_file}: {file_result}")
         
-        total_time = time.time() - start_time
+        total_time = (time.perf_counter_ns() - start_time) / 1e9
         total_audio_duration = sum([r['audio_duration'] for r in results.values()])
         overall_rtf = total_time / total_audio_duration
         
@@ -257,44 +301,49 @@ def benchmark_parallel_processing(audio_files, max_workers=None):
         logger.error(f"Error benchmarking parallel processing: {str(e)}")
         return None
 
+# Figure reused across plot_results calls, created on first use
+_FIG = None
+_AX = None
+
 def plot_results(results, title, output_file=None):
     """Plot benchmark results."""
+    global _FIG, _AX
+    
     try:
+        # Imported lazily so runs without --plot skip the matplotlib startup cost
         import matplotlib.pyplot as plt
-        import numpy as np
         
-        plt.figure(figsize=(12, 6))
+        if _FIG is None:
+            _FIG, _AX = plt.subplots(figsize=(12, 6))
+        else:
+            _AX.clear()
         
         if 'files' in results:
             # Parallel processing results
             files = list(results['files'].keys())
-            rtfs = [results['files'][f]['rtf'] for f in files]
-            
-            plt.bar(files, rtfs)
-            plt.axhline(y=results['overall_rtf'], color='r', linestyle='-', label=f"Overall RTF: {results['overall_rtf']:.2f}x")
-            plt.ylabel('Real-time Factor (RTF)')
-            plt.xlabel('Audio Files')
-            plt.title(f"{title} - Overall RTF: {results['overall_rtf']:.2f}x")
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.legend()
+            rtfs = np.fromiter((results['files'][f]['rtf'] for f in files), dtype=np.float64, count=len(files))
+            avg_rtf = results['overall_rtf']
+            label = "Overall RTF"
         
         else:
             # Individual component results
             files = list(results.keys())
-            rtfs = [results[f]['avg_rtf'] for f in files]
-            
-            plt.bar(files, rtfs)
-            plt.axhline(y=np.mean(rtfs), color='r', linestyle='-', label=f"Average RTF: {np.mean(rtfs):.2f}x")
-            plt.ylabel('Real-time Factor (RTF)')
-            plt.xlabel('Audio Files')
-            plt.title(f"{title} - Average RTF: {np.mean(rtfs):.2f}x")
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.legend()
+            rtfs = np.fromiter((results[f]['avg_rtf'] for f in files), dtype=np.float64, count=len(files))
+            avg_rtf = rtfs.mean()
+            label = "Average RTF"
+        
+        _AX.bar(files, rtfs)
+        _AX.axhline(y=avg_rtf, color='r', linestyle='-', label=f"{label}: {avg_rtf:.2f}x")
+        _AX.set_ylabel('Real-time Factor (RTF)')
+        _AX.set_xlabel('Audio Files')
+        _AX.set_title(f"{title} - {label}: {avg_rtf:.2f}x")
+        _AX.tick_params(axis='x', labelrotation=45)
+        plt.setp(_AX.get_xticklabels(), ha='right')
+        _AX.legend()
+        _FIG.tight_layout()
         
         if output_file:
-            plt.savefig(output_file)
+            _FIG.savefig(output_file)
             logger.info(f"Plot saved to {output_file}")
         else:
             plt.show()
@@ -302,6 +351,17 @@ def plot_results(results, title, output_file=None):
     except Exception as e:
         logger.error(f"Error plotting results: {str(e)}")
 
+AUDIO_EXTENSIONS = frozenset(('.mp3', '.wav', '.ogg'))
+
+def find_audio_files(directory):
+    """Recursively yield paths of audio files under a directory."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from find_audio_files(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS:
+                yield entry.path
+
 def get_sample_texts():
     """Get sample texts for benchmarking."""
     return [
@@ -331,10 +391,7 @@ def main():
             logger.error(f"Audio directory not found: {args.audio_dir}")
             sys.exit(1)
         
-        for root, _, files in os.walk(args.audio_dir):
-            for file in files:
-                if file.lower().endswith(('.mp3', '.wav', '.ogg')):
-                    audio_files.append(os.path.join(root, file))
+        audio_files = list(find_audio_files(args.audio_dir))
     
     # Run benchmarks
     if args.component == 'asr':
@@ -1,13 +1,17 @@
 import os
-import json
 import wave
+import subprocess
 import numpy as np
 from vosk import Model, KaldiRecognizer, SetLogLevel
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
 import logging
 import time
-from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional here; fall back to the stdlib parser
+    from json import loads as json_loads
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -16,12 +20,39 @@ logger = logging.getLogger(__name__)
 # Set Vosk log level to warnings only
 SetLogLevel(-1)
 
+# Read-ahead buffer for WAV input, so disk reads are batched ahead of the decoder
+WAV_READ_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+# WAV payloads smaller than this are decoded in a single call
+SMALL_WAV_BYTES = 1 << 20  # 1 MiB
+
+# PCM format produced by ffmpeg for the recognizer
+FFMPEG_SAMPLE_RATE = 16000
+FFMPEG_CHUNK_BYTES = 8000
+
+def _empty_times() -> np.ndarray:
+    return np.empty(0, dtype=np.float32)
+
 class TranscriptionResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
     text: str
-    segments: List[Dict[str, Any]] = []
+    # Word segments stored as parallel arrays instead of one dict per word
+    starts: np.ndarray = Field(default_factory=_empty_times)
+    ends: np.ndarray = Field(default_factory=_empty_times)
+    confs: np.ndarray = Field(default_factory=_empty_times)
+    words: List[str] = []
     processing_time: float
     audio_duration: float
     wer: Optional[float] = None
+    
+    @property
+    def segments(self) -> List[Dict[str, Any]]:
+        """Word segments as a list of Vosk-style dicts."""
+        return [
+            {"word": word, "start": float(start), "end": float(end), "conf": float(conf)}
+            for word, start, end, conf in zip(self.words, self.starts, self.ends, self.confs)
+        ]
 
 class SpeechRecognizer:
     def __init__(self, model_path: str = None):
@@ -36,93 +67,158 @@ class SpeechRecognizer:
         logger.info(f"Loading ASR model from {model_path}")
         self.model = Model(model_path)
         logger.info("ASR model loaded successfully")
-        
-        # Create a thread pool for parallel processing
-        self.executor = ThreadPoolExecutor(max_workers=os.cpu_count())
     
-    def transcribe_file(self, audio_path: str) -> TranscriptionResult:
-        """Transcribe an audio file and return the text."""
-        if not os.path.exists(audio_path):
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
-        
-        start_time = time.time()
-        
-        # Open the audio file
-        wf = wave.open(audio_path, "rb")
-        
-        # Get audio duration
-        audio_duration = wf.getnframes() / wf.getframerate()
-        
-        # Check if the audio format is compatible
-        if wf.getsampwidth() != 2 or wf.getcomptype() != "NONE":
-            raise ValueError("Audio file must be WAV format PCM")
-        
-        # Create recognizer
-        rec = KaldiRecognizer(self.model, wf.getframerate())
+    def _recognize(self, chunks: Iterable[bytes], sample_rate: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Feed 16-bit PCM chunks to a new recognizer and return its results and the bytes consumed."""
+        rec = KaldiRecognizer(self.model, sample_rate)
         rec.SetWords(True)
         rec.SetPartialWords(True)
         
-        # Process audio in chunks
         results = []
-        while True:
-            data = wf.readframes(4000)
-            if len(data) == 0:
-                break
+        num_bytes = 0
+        for data in chunks:
+            num_bytes += len(data)
             if rec.AcceptWaveform(data):
-                part_result = json.loads(rec.Result())
+                part_result = json_loads(rec.Result())
                 results.append(part_result)
         
         # Get final result
-        final_result = json.loads(rec.FinalResult())
+        final_result = json_loads(rec.FinalResult())
         results.append(final_result)
         
+        return results, num_bytes
+    
+    def _build_result(self, results: List[Dict[str, Any]], start_time: float, audio_duration: float) -> TranscriptionResult:
+        """Combine recognizer results into a TranscriptionResult."""
         # Combine all results
         all_text = " ".join([r.get("text", "") for r in results if "text" in r and r["text"]])
         
-        # Extract all segments
-        all_segments = []
+        # Extract all segments into preallocated parallel arrays
+        num_words = sum(len(r.get("result", ())) for r in results)
+        starts = np.empty(num_words, dtype=np.float32)
+        ends = np.empty(num_words, dtype=np.float32)
+        confs = np.empty(num_words, dtype=np.float32)
+        words = []
+        i = 0
         for r in results:
-            if "result" in r:
-                all_segments.extend(r["result"])
+            for segment in r.get("result", ()):
+                starts[i] = segment["start"]
+                ends[i] = segment["end"]
+                confs[i] = segment["conf"]
+                words.append(segment["word"])
+                i += 1
         
         processing_time = time.time() - start_time
         
         return TranscriptionResult(
             text=all_text,
-            segments=all_segments,
+            starts=starts,
+            ends=ends,
+            confs=confs,
+            words=words,
             processing_time=processing_time,
             audio_duration=audio_duration
         )
     
+    def transcribe_file(self, audio_path: str) -> TranscriptionResult:
+        """Transcribe an audio file and return the text."""
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        
+        start_time = time.time()
+        
+        # Open the audio file with a large read-ahead buffer so the decoder
+        # loop is fed from memory instead of issuing a read per chunk
+        with open(audio_path, "rb", buffering=WAV_READ_BUFFER_SIZE) as f, wave.open(f, "rb") as wf:
+            # Get audio duration
+            audio_duration = wf.getnframes() / wf.getframerate()
+            
+            # Check if the audio format is compatible
+            if wf.getsampwidth() != 2 or wf.getcomptype() != "NONE":
+                raise ValueError("Audio file must be WAV format PCM")
+            
+            # Process audio in chunks; small files are fed to the decoder whole
+            chunk_frames = 4000
+            if wf.getnframes() * wf.getsampwidth() < SMALL_WAV_BYTES:
+                chunk_frames = max(wf.getnframes(), 1)
+            
+            chunks = iter(lambda: wf.readframes(chunk_frames), b"")
+            results, _ = self._recognize(chunks, wf.getframerate())
+        
+        return self._build_result(results, start_time, audio_duration)
+    
+    def _ffmpeg_stream(self, input_file: str) -> Iterator[bytes]:
+        """Decode an audio file with ffmpeg and yield raw 16 kHz mono 16-bit PCM chunks."""
+        cmd = [
+            "ffmpeg", "-loglevel", "error", "-i", input_file,
+            "-f", "s16le", "-acodec", "pcm_s16le", "-ar", str(FFMPEG_SAMPLE_RATE), "-ac", "1",
+            "-"
+        ]
+        
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=WAV_READ_BUFFER_SIZE)
+        try:
+            while True:
+                chunk = proc.stdout.read(FFMPEG_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+            
+            stderr = proc.stderr.read()
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+        finally:
+            # Stop ffmpeg if the consumer bailed out early
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            proc.stderr.close()
+    
+    def transcribe_stream(self, audio_path: str) -> TranscriptionResult:
+        """Transcribe any ffmpeg-readable audio file by piping decoded PCM straight into the recognizer."""
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        
+        start_time = time.time()
+        results, num_bytes = self._recognize(self._ffmpeg_stream(audio_path), FFMPEG_SAMPLE_RATE)
+        
+        # 16-bit mono PCM: two bytes per sample
+        audio_duration = num_bytes / (FFMPEG_SAMPLE_RATE * 2)
+        
+        return self._build_result(results, start_time, audio_duration)
+    
     def convert_to_wav(self, input_file: str, output_file: str = None) -> str:
         """Convert audio file to WAV format for processing."""
         if output_file is None:
             output_file = os.path.splitext(input_file)[0] + ".wav"
         
         # Use ffmpeg to convert the file
-        import subprocess
         cmd = [
             "ffmpeg", "-y", "-i", input_file,
-            "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1",
+            "-acodec", "pcm_s16le", "-ar", str(FFMPEG_SAMPLE_RATE), "-ac", "1",
             output_file
         ]
         
         subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return output_file
     
+    def is_compatible_wav(self, audio_path: str) -> bool:
+        """Check if a file is a mono 16-bit PCM WAV that can be transcribed as is."""
+        try:
+            with wave.open(audio_path, "rb") as wf:
+                return wf.getnchannels() == 1 and wf.getsampwidth() == 2 and wf.getcomptype() == "NONE"
+        except (wave.Error, EOFError):
+            return False
+    
     def process_audio(self, audio_path: str) -> TranscriptionResult:
         """Process audio file, converting if necessary."""
-        # Check if the file is already in WAV format
-        if not audio_path.lower().endswith('.wav'):
-            logger.info(f"Converting {audio_path} to WAV format")
-            wav_path = self.convert_to_wav(audio_path)
-            result = self.transcribe_file(wav_path)
-            # Clean up temporary WAV file if it's different from the original
-            if wav_path != audio_path:
-                os.remove(wav_path)
-            return result
-        else:
+        # Skip the ffmpeg round-trip for files that are already usable
+        if self.is_compatible_wav(audio_path):
             return self.transcribe_file(audio_path)
+        
+        # Decode everything else through an ffmpeg pipe, without a temporary WAV file
+        logger.info(f"Decoding {audio_path} with ffmpeg")
+        return self.transcribe_stream(audio_path)
 
 # Singleton instance
 _recognizer = None
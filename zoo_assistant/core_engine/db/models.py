@@ -1,10 +1,26 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Table
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Table, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.ext.compiler import compiles
 import datetime
 
 Base = declarative_base()
 
+class utcnow(FunctionElement):
+    """Current UTC time, evaluated by the database."""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return "CURRENT_TIMESTAMP"
+
+@compiles(utcnow, 'postgresql')
+def _pg_utcnow(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
 # Association table for many-to-many relationships between animals
 animal_relationships = Table(
     'animal_relationships',
@@ -12,7 +28,7 @@ animal_relationships = Table(
     Column('animal_id', Integer, ForeignKey('animals.id'), primary_key=True),
     Column('related_animal_id', Integer, ForeignKey('animals.id'), primary_key=True),
     Column('relationship_type', String(50)),
-    Column('created_at', DateTime, default=datetime.datetime.utcnow)
+    Column('created_at', DateTime, server_default=utcnow())
 )
 
 class Animal(Base):
@@ -23,8 +39,8 @@ class Animal(Base):
     species = Column(String(100), nullable=False)
     age = Column(Float, nullable=True)
     enclosure = Column(String(100), nullable=True)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     observations = relationship("Observation", back_populates="animal")
@@ -36,6 +52,12 @@ class Animal(Base):
 
 class Observation(Base):
     __tablename__ = 'observations'
+    __table_args__ = (
+        # Latest-record lookups per animal: WHERE animal_id = ? ORDER BY timestamp DESC
+        Index('ix_observations_animal_id_timestamp', 'animal_id', 'timestamp'),
+        # Date-range scans joined to animals (daily report)
+        Index('ix_observations_timestamp_animal_id', 'timestamp', 'animal_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     animal_id = Column(Integer, ForeignKey('animals.id'))
@@ -57,6 +79,12 @@ class Observation(Base):
 
 class Measurement(Base):
     __tablename__ = 'measurements'
+    __table_args__ = (
+        # Latest-record lookups per animal: WHERE animal_id = ? ORDER BY timestamp DESC
+        Index('ix_measurements_animal_id_timestamp', 'animal_id', 'timestamp'),
+        # Date-range scans joined to animals (daily report)
+        Index('ix_measurements_timestamp_animal_id', 'timestamp', 'animal_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     animal_id = Column(Integer, ForeignKey('animals.id'))
@@ -74,6 +102,12 @@ class Measurement(Base):
 
 class Feeding(Base):
     __tablename__ = 'feedings'
+    __table_args__ = (
+        # Latest-record lookups per animal: WHERE animal_id = ? ORDER BY timestamp DESC
+        Index('ix_feedings_animal_id_timestamp', 'animal_id', 'timestamp'),
+        # Date-range scans joined to animals (daily report)
+        Index('ix_feedings_timestamp_animal_id', 'timestamp', 'animal_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     animal_id = Column(Integer, ForeignKey('animals.id'))
@@ -95,8 +129,13 @@ class EntityConfig(Base):
     entity_type = Column(String(50), nullable=False, unique=True)
     is_active = Column(Boolean, default=True)
     priority = Column(Integer, default=1)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
+    
+    __table_args__ = (
+        # Active configs in priority order, covering the columns the API reads
+        Index('ix_entity_configs_active_priority', 'is_active', 'priority', 'entity_type'),
+    )
     
     def __repr__(self):
         return f"<EntityConfig(type='{self.entity_type}', active='{self.is_active}')>"
\ No newline at end of file
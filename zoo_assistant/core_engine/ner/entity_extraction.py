@@ -1,13 +1,22 @@
+import os
 import re
+import json
+import tempfile
+import copy
+import bisect
+import hashlib
 import logging
+import threading
+from functools import lru_cache, cached_property
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+from dataclasses import dataclass
 from typing import List, Dict, Any, Optional, Tuple
-from pydantic import BaseModel
+from cachetools import LRUCache
 from natasha import (
     Segmenter,
     MorphVocab,
     NewsEmbedding,
-    NewsMorphTagger,
-    NewsSyntaxParser,
     NewsNERTagger,
     Doc
 )
@@ -23,31 +32,106 @@ from yargy import rule
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class Entity(BaseModel):
+# Directory for caching the lemma/form indexes built from the dictionaries
+NER_CACHE_DIR = os.getenv(
+    "NER_CACHE_DIR",
+    os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "zoo_assistant")
+)
+
+# Number of transcriptions whose extracted animal info is kept in memory
+# (0 disables the cache)
+ANIMAL_INFO_CACHE_SIZE = int(os.getenv("ANIMAL_INFO_CACHE_SIZE", "0"))
+
+# Regex patterns, compiled once at import time
+_WORD_RE = re.compile(r'[а-яё]+', re.IGNORECASE)
+_NUM_RE = re.compile(r'\d+[.,]?\d*')
+_DIGIT_RE = re.compile(r'\d')
+# Dates, times, percentages and ages, as one alternation so the text is scanned once;
+# the named group that matched gives the entity type
+_REGEX_ENTITY_RE = re.compile(
+    # Date (e.g., "01.01.2023", "1 января 2023")
+    r'(?P<date>\b\d{1,2}[./-]\d{1,2}[./-]\d{2,4}\b|\b\d{1,2}\s+(?:января|февраля|марта|апреля|мая|июня|июля|августа|сентября|октября|ноября|декабря)\s+\d{4}\b)'
+    # Time (e.g., "14:30", "2:45")
+    r'|(?P<time>\b\d{1,2}[:]\d{2}\b)'
+    # Percentage (e.g., "50%", "70 процентов")
+    r'|(?P<percentage>\b\d+(?:[.,]\d+)?%|\b\d+(?:[.,]\d+)?\s+процент(?:а|ов)?\b)'
+    # Age (e.g., "5 лет", "2 года")
+    r'|(?P<age>\b\d+\s+(?:лет|год(?:а)?)\b)'
+)
+
+# Marker for body (rather than environmental) temperature
+_BODY_MARK = 'тела'
+_BODY_MARK_RE = re.compile(_BODY_MARK, re.IGNORECASE)
+
+# Fields of the animal info taken from the first entity of each type:
+# type -> (section or None for top level, field, Entity attribute)
+_FIRST_FIELDS = {
+    'person': (None, 'name', 'text'),  # Assume the first person entity might be the animal name
+    'animal_species': (None, 'species', 'text'),
+    'weight': ('measurements', 'weight', 'value'),
+    'length': ('measurements', 'length', 'value'),
+    'age': ('measurements', 'age', 'value'),
+    'behavior': (None, 'behavior', 'text'),
+    'health_status': (None, 'health_status', 'text'),
+    'food': ('feeding', 'food_type', 'text')
+}
+
+# Regex entity types that carry a numeric value
+_VALUED_REGEX_TYPES = frozenset(('percentage', 'age'))
+
+@dataclass
+class Entity:
     text: str
     type: str
     start: int
     end: int
     value: Optional[Any] = None
     normalized: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the entity to a plain dict."""
+        return {
+            'text': self.text,
+            'type': self.type,
+            'start': self.start,
+            'end': self.end,
+            'value': self.value,
+            'normalized': self.normalized
+        }
+
+_BY_START = attrgetter('start')
+
+@lru_cache(maxsize=1)
+def _shared_embedding() -> NewsEmbedding:
+    """Get the Natasha news embedding, loaded once per process."""
+    return NewsEmbedding()
+
+@lru_cache(maxsize=1)
+def _shared_ner_tagger() -> NewsNERTagger:
+    """Get the Natasha NER tagger, loaded once per process."""
+    return NewsNERTagger(_shared_embedding())
+
+@lru_cache(maxsize=1)
+def _shared_morph() -> pymorphy2.MorphAnalyzer:
+    """Get the PyMorphy2 analyzer, loaded once per process."""
+    return pymorphy2.MorphAnalyzer()
+
+def preload_shared_models():
+    """Load the process-wide Natasha and PyMorphy2 models now.
+    
+    Calling this before forking worker processes lets the workers share the
+    parent's read-only model pages instead of each loading a private copy.
+    """
+    _shared_ner_tagger()
+    _shared_morph()
 
 class EntityExtractor:
     def __init__(self):
-        """Initialize the entity extractor with Natasha components."""
+        """Initialize the entity extractor; Natasha models are loaded on first use."""
         logger.info("Initializing NER components")
         
-        # Initialize Natasha components
-        self.segmenter = Segmenter()
-        self.morph_vocab = MorphVocab()
-        
-        # Initialize embeddings and taggers
-        self.emb = NewsEmbedding()
-        self.morph_tagger = NewsMorphTagger(self.emb)
-        self.syntax_parser = NewsSyntaxParser(self.emb)
-        self.ner_tagger = NewsNERTagger(self.emb)
-        
         # Initialize PyMorphy2 for morphological analysis
-        self.morph = pymorphy2.MorphAnalyzer()
+        self.morph = _shared_morph()
         
         # Initialize Yargy tokenizer
         self.tokenizer = MorphTokenizer()
@@ -55,8 +139,48 @@ class EntityExtractor:
         # Initialize custom rules
         self._init_custom_rules()
         
+        # Cache of extract_animal_info results, keyed by a hash of the text
+        self._animal_info_cache = (
+            LRUCache(maxsize=ANIMAL_INFO_CACHE_SIZE) if ANIMAL_INFO_CACHE_SIZE else None
+        )
+        self._animal_info_lock = threading.Lock()
+        
+        # Pool for running the independent extractors side by side, created
+        # lazily per process (see _executor)
+        self._pool = None
+        self._pool_pid = None
+        
         logger.info("NER components initialized successfully")
     
+    @cached_property
+    def segmenter(self) -> Segmenter:
+        """Lazy-load the Natasha segmenter."""
+        return Segmenter()
+    
+    @cached_property
+    def morph_vocab(self) -> MorphVocab:
+        """Lazy-load the Natasha morph vocabulary."""
+        return MorphVocab()
+    
+    @cached_property
+    def emb(self) -> NewsEmbedding:
+        """Lazy-load the Natasha embedding shared by all extractors."""
+        return _shared_embedding()
+    
+    @cached_property
+    def ner_tagger(self) -> NewsNERTagger:
+        """Lazy-load the Natasha NER tagger shared by all extractors.
+        
+        Morphology and syntax models are not loaded: the NER tagger works on
+        tokens alone and spans are never normalized.
+        """
+        return _shared_ner_tagger()
+    
+    def warm_up(self):
+        """Load the Natasha models ahead of the first extraction."""
+        self.segmenter
+        self.ner_tagger
+    
     def _init_custom_rules(self):
         """Initialize custom extraction rules for zoo-specific entities."""
         # Animal species dictionary
@@ -90,114 +214,174 @@ class EntityExtractor:
         
         # Create Yargy rules
         
-        # Weight rule (e.g., "42 килограмма", "2.5 кг")
-        WEIGHT_WORDS = morph_pipeline(['килограмм', 'кг', 'грамм', 'г'])
-        INT = type_predicate('INT')
-        FLOAT = type_predicate('FLOAT')
-        NUMBER = INT | FLOAT
-        
-        self.weight_rule = rule(
-            NUMBER,
-            WEIGHT_WORDS
-        )
-        self.weight_parser = Parser(self.weight_rule)
+        # Unit words for numeric quantities, by entity type
+        # (e.g., "42 килограмма", "4 метра 30 сантиметров", "28 градусов")
+        self.unit_words = {
+            'weight': ['килограмм', 'кг', 'грамм', 'г'],
+            'length': ['метр', 'м', 'сантиметр', 'см'],
+            'temperature': ['градус', '°C', '°']
+        }
         
-        # Length/height rule (e.g., "4 метра 30 сантиметров", "1.65 м")
-        LENGTH_WORDS = morph_pipeline(['метр', 'м', 'сантиметр', 'см'])
+        # Dictionary words, by entity type, with duplicates dropped (order kept)
+        self.dictionary_words = {
+            'animal_species': list(dict.fromkeys(self.animal_species)),
+            'behavior': list(dict.fromkeys(self.behaviors)),
+            'health_status': list(dict.fromkeys(self.health_statuses)),
+            'food': list(dict.fromkeys(self.foods))
+        }
         
-        self.length_rule = rule(
-            NUMBER,
-            LENGTH_WORDS
-        )
-        self.length_parser = Parser(self.length_rule)
+        # unit_types maps each unit lemma to its entity types, so one Yargy quantity
+        # parser pass serves all quantity types; dictionary_forms maps every inflected
+        # form of every dictionary word to its entity types, so dictionary entities
+        # are found with one hash lookup per word. Both indexes are cached on disk,
+        # since building them dominates startup
+        self.unit_types, self.dictionary_forms = self._load_indexes()
         
-        # Temperature rule (e.g., "28 градусов")
-        TEMP_WORDS = morph_pipeline(['градус', '°C', '°'])
+        # Quantity rule: a number followed by any known unit
+        INT = type_predicate('INT')
+        FLOAT = type_predicate('FLOAT')
+        NUMBER = INT | FLOAT
+        UNIT_WORDS = morph_pipeline([word for words in self.unit_words.values() for word in words])
         
-        self.temp_rule = rule(
+        self.quantity_rule = rule(
             NUMBER,
-            TEMP_WORDS
+            UNIT_WORDS
         )
-        self.temp_parser = Parser(self.temp_rule)
-        
-        # Animal species rule
-        ANIMAL_WORDS = morph_pipeline(self.animal_species)
-        self.animal_parser = Parser(ANIMAL_WORDS)
-        
-        # Behavior rule
-        BEHAVIOR_WORDS = morph_pipeline(self.behaviors)
-        self.behavior_parser = Parser(BEHAVIOR_WORDS)
-        
-        # Health status rule
-        HEALTH_WORDS = morph_pipeline(self.health_statuses)
-        self.health_parser = Parser(HEALTH_WORDS)
-        
-        # Food rule
-        FOOD_WORDS = morph_pipeline(self.foods)
-        self.food_parser = Parser(FOOD_WORDS)
+        # Share the extractor's tokenizer so its morph cache serves the parser too
+        self.quantity_parser = Parser(self.quantity_rule, tokenizer=self.tokenizer)
+    
+    def _load_indexes(self) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """Load the unit and dictionary indexes from the disk cache, building them on a miss."""
+        # Key the cache on the word lists and the morphology version that produced it
+        key_source = json.dumps([self.unit_words, self.dictionary_words, pymorphy2.__version__], ensure_ascii=False)
+        digest = hashlib.blake2b(key_source.encode("utf-8"), digest_size=8).hexdigest()
+        cache_path = os.path.join(NER_CACHE_DIR, f"ner_index_{digest}.json")
+        
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            return cached["unit_types"], cached["dictionary_forms"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable NER index cache {cache_path}: {str(e)}")
+        
+        unit_types = self._build_lemma_index(self.unit_words)
+        dictionary_forms = self._build_form_index(self.dictionary_words)
+        
+        # Write to a temporary file first so readers never see a partial cache
+        try:
+            os.makedirs(NER_CACHE_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=NER_CACHE_DIR, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"unit_types": unit_types, "dictionary_forms": dictionary_forms}, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write NER index cache {cache_path}: {str(e)}")
+        
+        return unit_types, dictionary_forms
+    
+    def _build_lemma_index(self, words_by_type: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Build a lemma -> entity types index for the given word lists."""
+        index = {}
+        for entity_type, words in words_by_type.items():
+            for word in words:
+                # Pipelines match on the first token's lemmas, so index those
+                first_part = self.tokenizer.split(word)[0]
+                for lemma in self.tokenizer.morph.normalized(first_part):
+                    types = index.setdefault(lemma, [])
+                    if entity_type not in types:
+                        types.append(entity_type)
+        return index
+    
+    def _build_form_index(self, words_by_type: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Build an inflected form -> entity types index for the given word lists."""
+        index = {}
+        for entity_type, words in words_by_type.items():
+            for word in words:
+                # Expand every reading of the word into its full lexeme
+                for parse in self.morph.parse(word):
+                    for form in parse.lexeme:
+                        types = index.setdefault(form.word.replace('ё', 'е'), [])
+                        if entity_type not in types:
+                            types.append(entity_type)
+        return index
+    
+    def _unit_types(self, token) -> List[str]:
+        """Get the entity types a matched unit token belongs to, in declaration order."""
+        if hasattr(token, 'forms'):
+            lemmas = {form.normalized for form in token.forms}
+        else:
+            lemmas = {token.normalized}
+        
+        found = {entity_type for lemma in lemmas for entity_type in self.unit_types.get(lemma, ())}
+        return [entity_type for entity_type in self.unit_words if entity_type in found]
     
     def _extract_numeric_value(self, match_text: str) -> float:
         """Extract numeric value from a matched text."""
-        # Extract all numbers from the text
-        numbers = re.findall(r'\d+[.,]?\d*', match_text)
-        if numbers:
+        # Only the first number is used, so stop scanning once it is found
+        number = _NUM_RE.search(match_text)
+        if number:
             # Convert to float, handling both comma and dot as decimal separator
-            return float(numbers[0].replace(',', '.'))
+            return float(number.group().replace(',', '.'))
         return None
     
-    def _extract_with_parser(self, text: str, parser: Parser, entity_type: str) -> List[Entity]:
-        """Extract entities using a Yargy parser."""
+    def _extract_quantity_entities(self, text: str) -> List[Entity]:
+        """Extract numeric quantities with the Yargy parser, typing each match by its unit."""
         entities = []
-        for match in parser.findall(text):
+        
+        # Every quantity starts with a number, so skip tokenizing texts without digits
+        if not _DIGIT_RE.search(text):
+            return entities
+        
+        for match in self.quantity_parser.findall(text):
             start, end = match.span
             match_text = text[start:end]
             
-            # For numeric entities, extract the value
-            value = None
-            if entity_type in ['weight', 'length', 'temperature']:
-                value = self._extract_numeric_value(match_text)
+            # Extract the numeric value
+            value = self._extract_numeric_value(match_text)
             
-            entities.append(Entity(
-                text=match_text,
-                type=entity_type,
-                start=start,
-                end=end,
-                value=value
-            ))
+            # The unit is the token right after the number
+            for entity_type in self._unit_types(match.tokens[1]):
+                entities.append(Entity(
+                    text=match_text,
+                    type=entity_type,
+                    start=start,
+                    end=end,
+                    value=value
+                ))
         
         return entities
     
-    def _extract_custom_entities(self, text: str) -> List[Entity]:
-        """Extract custom entities using Yargy rules."""
+    def _extract_dictionary_entities(self, text: str) -> List[Entity]:
+        """Extract dictionary entities in a single pass over the words of the text."""
         entities = []
+        for match in _WORD_RE.finditer(text):
+            types = self.dictionary_forms.get(match.group().lower().replace('ё', 'е'))
+            if not types:
+                continue
+            
+            for entity_type in types:
+                entities.append(Entity(
+                    text=match.group(),
+                    type=entity_type,
+                    start=match.start(),
+                    end=match.end()
+                ))
         
-        # Extract weights
-        weight_entities = self._extract_with_parser(text, self.weight_parser, 'weight')
-        entities.extend(weight_entities)
-        
-        # Extract lengths
-        length_entities = self._extract_with_parser(text, self.length_parser, 'length')
-        entities.extend(length_entities)
-        
-        # Extract temperatures
-        temp_entities = self._extract_with_parser(text, self.temp_parser, 'temperature')
-        entities.extend(temp_entities)
-        
-        # Extract animal species
-        animal_entities = self._extract_with_parser(text, self.animal_parser, 'animal_species')
-        entities.extend(animal_entities)
-        
-        # Extract behaviors
-        behavior_entities = self._extract_with_parser(text, self.behavior_parser, 'behavior')
-        entities.extend(behavior_entities)
+        return entities
+    
+    def _extract_custom_entities(self, text: str) -> List[Entity]:
+        """Extract custom entities using Yargy rules and the zoo dictionaries."""
+        entities = []
         
-        # Extract health statuses
-        health_entities = self._extract_with_parser(text, self.health_parser, 'health_status')
-        entities.extend(health_entities)
+        # Extract weights, lengths and temperatures, typed by their unit
+        quantity_entities = self._extract_quantity_entities(text)
+        entities.extend(quantity_entities)
         
-        # Extract foods
-        food_entities = self._extract_with_parser(text, self.food_parser, 'food')
-        entities.extend(food_entities)
+        # Extract animal species, behaviors, health statuses and foods
+        dictionary_entities = self._extract_dictionary_entities(text)
+        entities.extend(dictionary_entities)
         
         return entities
     
@@ -206,8 +390,6 @@ class EntityExtractor:
         # Process the text with Natasha
         doc = Doc(text)
         doc.segment(self.segmenter)
-        doc.tag_morph(self.morph_tagger)
-        doc.parse_syntax(self.syntax_parser)
         doc.tag_ner(self.ner_tagger)
         
         # Convert spans to our Entity format
@@ -236,45 +418,17 @@ class EntityExtractor:
         """Extract entities using regex patterns."""
         entities = []
         
-        # Date pattern (e.g., "01.01.2023", "1 января 2023")
-        date_pattern = r'\b\d{1,2}[./-]\d{1,2}[./-]\d{2,4}\b|\b\d{1,2}\s+(?:января|февраля|марта|апреля|мая|июня|июля|августа|сентября|октября|ноября|декабря)\s+\d{4}\b'
-        for match in re.finditer(date_pattern, text):
-            entities.append(Entity(
-                text=match.group(),
-                type='date',
-                start=match.start(),
-                end=match.end()
-            ))
-        
-        # Time pattern (e.g., "14:30", "2:45")
-        time_pattern = r'\b\d{1,2}[:]\d{2}\b'
-        for match in re.finditer(time_pattern, text):
-            entities.append(Entity(
-                text=match.group(),
-                type='time',
-                start=match.start(),
-                end=match.end()
-            ))
-        
-        # Percentage pattern (e.g., "50%", "70 процентов")
-        percentage_pattern = r'\b\d+(?:[.,]\d+)?%|\b\d+(?:[.,]\d+)?\s+процент(?:а|ов)?\b'
-        for match in re.finditer(percentage_pattern, text):
-            value = self._extract_numeric_value(match.group())
-            entities.append(Entity(
-                text=match.group(),
-                type='percentage',
-                start=match.start(),
-                end=match.end(),
-                value=value
-            ))
-        
-        # Age pattern (e.g., "5 лет", "2 года")
-        age_pattern = r'\b\d+\s+(?:лет|год(?:а)?)\b'
-        for match in re.finditer(age_pattern, text):
-            value = self._extract_numeric_value(match.group())
+        # Dates, times, percentages and ages in a single pass
+        for match in _REGEX_ENTITY_RE.finditer(text):
+            entity_type = match.lastgroup
+            
+            value = None
+            if entity_type in _VALUED_REGEX_TYPES:
+                value = self._extract_numeric_value(match.group())
+            
             entities.append(Entity(
                 text=match.group(),
-                type='age',
+                type=entity_type,
                 start=match.start(),
                 end=match.end(),
                 value=value
@@ -282,29 +436,55 @@ class EntityExtractor:
         
         return entities
     
+    def _executor(self) -> ThreadPoolExecutor:
+        """Get the extractor thread pool for the current process."""
+        # Worker threads don't survive fork(), so a pool inherited from the
+        # parent (e.g. in process_audio_batch workers) would never run the
+        # submitted work. Build a fresh one whenever the PID changes.
+        pid = os.getpid()
+        if self._pool_pid != pid:
+            self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ner")
+            self._pool_pid = pid
+        return self._pool
+    
     def extract_entities(self, text: str) -> List[Entity]:
         """Extract all entities from the text."""
-        # Combine entities from all extraction methods
-        entities = []
-        
-        # Extract using Natasha NER
-        natasha_entities = self._extract_natasha_entities(text)
-        entities.extend(natasha_entities)
-        
-        # Extract using custom rules
-        custom_entities = self._extract_custom_entities(text)
-        entities.extend(custom_entities)
-        
-        # Extract using regex patterns
+        # The extractors don't depend on each other, so run Natasha NER and the
+        # custom rules in the pool while the regex patterns run on this thread
+        pool = self._executor()
+        natasha_future = pool.submit(self._extract_natasha_entities, text)
+        custom_future = pool.submit(self._extract_custom_entities, text)
         regex_entities = self._extract_regex_entities(text)
+        
+        # Combine entities from all extraction methods, in a fixed order
+        entities = []
+        entities.extend(natasha_future.result())
+        entities.extend(custom_future.result())
         entities.extend(regex_entities)
         
         # Sort entities by start position
-        entities.sort(key=lambda e: e.start)
+        entities.sort(key=_BY_START)
         
         return entities
     
     def extract_animal_info(self, text: str) -> Dict[str, Any]:
+        """Extract structured animal information from text, reusing results for repeated texts if caching is enabled."""
+        if self._animal_info_cache is None:
+            return self._extract_animal_info(text)
+        
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._animal_info_lock:
+            cached = self._animal_info_cache.get(key)
+        
+        if cached is None:
+            cached = self._extract_animal_info(text)
+            with self._animal_info_lock:
+                self._animal_info_cache[key] = cached
+        
+        # Hand out a copy so callers can't mutate the cached result
+        return copy.deepcopy(cached)
+    
+    def _extract_animal_info(self, text: str) -> Dict[str, Any]:
         """Extract structured animal information from text."""
         entities = self.extract_entities(text)
         
@@ -328,63 +508,49 @@ class EntityExtractor:
                 'temperature': None,
                 'humidity': None
             },
-            'entities': [e.dict() for e in entities]
+            'entities': [e.to_dict() for e in entities]
         }
         
-        # Extract animal name and species
+        # Positions of the body-temperature marker, found once per text
+        body_marks = [m.start() for m in _BODY_MARK_RE.finditer(text)]
+        
+        food_entity = None
+        weights = []
         for entity in entities:
-            if entity.type == 'person':
-                # Assume the first person entity might be the animal name
-                if result['name'] is None:
-                    result['name'] = entity.text
-            
-            elif entity.type == 'animal_species':
-                if result['species'] is None:
-                    result['species'] = entity.text
-            
-            # Extract measurements
-            elif entity.type == 'weight':
-                if result['measurements']['weight'] is None:
-                    result['measurements']['weight'] = entity.value
-            
-            elif entity.type == 'length':
-                if result['measurements']['length'] is None:
-                    result['measurements']['length'] = entity.value
-            
-            elif entity.type == 'temperature':
+            if entity.type == 'temperature':
                 # Determine if it's body temperature or environmental
                 # This is a simplification - in reality would need context analysis
-                if 'тела' in text[max(0, entity.start-10):entity.end+10]:
+                window_start = max(0, entity.start - 10)
+                i = bisect.bisect_left(body_marks, window_start)
+                if i < len(body_marks) and body_marks[i] + len(_BODY_MARK) <= entity.end + 10:
                     result['measurements']['temperature'] = entity.value
                 else:
                     result['environment']['temperature'] = entity.value
+                continue
             
-            elif entity.type == 'age':
-                if result['measurements']['age'] is None:
-                    result['measurements']['age'] = entity.value
-            
-            # Extract behavior and health
-            elif entity.type == 'behavior':
-                if result['behavior'] is None:
-                    result['behavior'] = entity.text
+            target = _FIRST_FIELDS.get(entity.type)
+            if target is None:
+                continue
             
-            elif entity.type == 'health_status':
-                if result['health_status'] is None:
-                    result['health_status'] = entity.text
+            # Keep the first value found for each field
+            section, field, attr = target
+            container = result[section] if section else result
+            if container[field] is None:
+                container[field] = getattr(entity, attr)
             
-            # Extract feeding info
-            elif entity.type == 'food':
-                if result['feeding']['food_type'] is None:
-                    result['feeding']['food_type'] = entity.text
+            if entity.type == 'food' and food_entity is None:
+                food_entity = entity
+            elif entity.type == 'weight':
+                weights.append(entity)
         
         # Try to find feeding quantity by looking for weight entities near food entities
-        food_entity = next((e for e in entities if e.type == 'food'), None)
-        if food_entity:
-            # Look for weight entities within 20 characters of the food entity
-            for entity in entities:
-                if entity.type == 'weight' and abs(entity.start - food_entity.start) < 20:
-                    result['feeding']['quantity'] = entity.value
-                    break
+        if food_entity and weights:
+            # Weights are in start order, so bisect to the first one starting
+            # within 20 characters of the food entity
+            weight_starts = [weight.start for weight in weights]
+            i = bisect.bisect_right(weight_starts, food_entity.start - 20)
+            if i < len(weights) and weights[i].start < food_entity.start + 20:
+                result['feeding']['quantity'] = weights[i].value
         
         return result
 
@@ -1,20 +1,31 @@
 import os
 import logging
 import time
+import hashlib
+import tempfile
+import multiprocessing
 from typing import Dict, Any, Optional, List
 from pydantic import BaseModel
 import json
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import insert, tuple_
 
 from .asr.speech_recognition import get_recognizer, TranscriptionResult
-from .ner.entity_extraction import get_extractor
-from .db.database import get_db
+from .ner.entity_extraction import get_extractor, preload_shared_models
+from .db.database import SessionLocal
 from .db.models import Animal, Observation, Measurement, Feeding
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Directory for caching processing results by audio content hash; caching is off when unset
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR")
+
+# Read size used when hashing audio files
+HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+
 class AudioProcessingResult(BaseModel):
     audio_file: str
     transcription: str
@@ -46,7 +57,46 @@ class ProcessingPipeline:
             self._extractor = get_extractor()
         return self._extractor
     
+    def warm_up(self):
+        """Load the speech recognizer and entity extractor ahead of the first request."""
+        self.recognizer
+        self.extractor.warm_up()
+    
     def process_audio(self, audio_path: str) -> AudioProcessingResult:
+        """Process an audio file through the entire pipeline, reusing cached results when enabled."""
+        if not RESULT_CACHE_DIR:
+            return self._process_audio(audio_path)
+        
+        cache_path = os.path.join(RESULT_CACHE_DIR, f"{_hash_file(audio_path)}.json")
+        try:
+            with open(cache_path, "rb") as f:
+                result = AudioProcessingResult.model_validate_json(f.read())
+            logger.info(f"Using cached result for {audio_path}")
+            
+            # The same content may arrive under a different name
+            result.audio_file = audio_path
+            result.db_records['observation']['audio_file'] = os.path.basename(audio_path)
+            return result
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cached result {cache_path}: {str(e)}")
+        
+        result = self._process_audio(audio_path)
+        
+        # Write to a temporary file first so readers never see a partial result
+        try:
+            os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=RESULT_CACHE_DIR, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(result.model_dump_json().encode("utf-8"))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache result for {audio_path}: {str(e)}")
+        
+        return result
+    
+    def _process_audio(self, audio_path: str) -> AudioProcessingResult:
         """Process an audio file through the entire pipeline."""
         start_time = time.time()
         
@@ -79,6 +129,23 @@ class ProcessingPipeline:
             db_records=db_records
         )
     
+    def process_audio_batch(self, audio_paths: List[str], num_workers: Optional[int] = None) -> List[AudioProcessingResult]:
+        """Process many audio files in parallel worker processes, returning results in input order."""
+        num_workers = num_workers or os.cpu_count()
+        # Hand files to the workers in batches to cut per-task dispatch overhead
+        chunksize = max(1, len(audio_paths) // (4 * num_workers))
+        
+        # Where fork is available, load the NER models here first so forked
+        # workers share their pages copy-on-write instead of loading their own
+        mp_context = None
+        if "fork" in multiprocessing.get_all_start_methods():
+            preload_shared_models()
+            mp_context = multiprocessing.get_context("fork")
+        
+        with ProcessPoolExecutor(max_workers=num_workers, mp_context=mp_context,
+                                 initializer=_init_batch_worker) as executor:
+            return list(executor.map(_process_one, audio_paths, chunksize=chunksize))
+    
     def _prepare_db_records(self, structured_data: Dict[str, Any], audio_path: str, transcription: str) -> Dict[str, Any]:
         """Prepare database records from structured data."""
         # Extract relevant information
@@ -89,9 +156,10 @@ class ProcessingPipeline:
         if not animal_name or not animal_species:
             # Simple heuristic: look for "наблюдение за" pattern
             observation_pattern = "наблюдение за"
-            if observation_pattern in transcription.lower():
+            pattern_idx = transcription.lower().find(observation_pattern)
+            if pattern_idx != -1:
                 # Extract the text after "наблюдение за"
-                start_idx = transcription.lower().find(observation_pattern) + len(observation_pattern)
+                start_idx = pattern_idx + len(observation_pattern)
                 end_idx = transcription.find(".", start_idx)
                 if end_idx == -1:
                     end_idx = transcription.find(",", start_idx)
@@ -150,7 +218,7 @@ class ProcessingPipeline:
     
     def save_to_database(self, result: AudioProcessingResult):
         """Save processing results to the database."""
-        db = next(get_db())
+        db = SessionLocal()
         try:
             # Check if animal exists
             animal_name = result.db_records['animal']['name']
@@ -225,6 +293,90 @@ class ProcessingPipeline:
             raise
         finally:
             db.close()
+    
+    def save_batch(self, results: List[AudioProcessingResult]) -> List[Dict[str, int]]:
+        """Save many processing results with a handful of bulk statements and one commit."""
+        if not results:
+            return []
+        
+        db = SessionLocal()
+        try:
+            # Look up all referenced animals in one query
+            keys = [(r.db_records['animal']['name'], r.db_records['animal']['species']) for r in results]
+            unique_keys = list(dict.fromkeys(keys))
+            animal_ids = {
+                (name, species): animal_id
+                for animal_id, name, species in db.query(Animal.id, Animal.name, Animal.species).filter(
+                    tuple_(Animal.name, Animal.species).in_(unique_keys)
+                )
+            }
+            
+            # Create the missing animals in one insert
+            missing = [key for key in unique_keys if key not in animal_ids]
+            if missing:
+                new_ids = db.scalars(
+                    insert(Animal).returning(Animal.id, sort_by_parameter_order=True),
+                    [{"name": name, "species": species} for name, species in missing]
+                ).all()
+                animal_ids.update(zip(missing, new_ids))
+            
+            timestamp = datetime.utcnow()
+            
+            # Create observations, keeping their IDs in input order
+            observation_ids = db.scalars(
+                insert(Observation).returning(Observation.id, sort_by_parameter_order=True),
+                [
+                    dict(r.db_records['observation'], animal_id=animal_ids[key], timestamp=timestamp)
+                    for r, key in zip(results, keys)
+                ]
+            ).all()
+            
+            # Create measurements and feedings where available
+            measurements = [
+                dict(r.db_records['measurement'], animal_id=animal_ids[key], timestamp=timestamp)
+                for r, key in zip(results, keys) if r.db_records.get('measurement')
+            ]
+            if measurements:
+                db.execute(insert(Measurement), measurements)
+            
+            feedings = [
+                dict(r.db_records['feeding'], animal_id=animal_ids[key], timestamp=timestamp)
+                for r, key in zip(results, keys) if r.db_records.get('feeding')
+            ]
+            if feedings:
+                db.execute(insert(Feeding), feedings)
+            
+            # Commit all changes
+            db.commit()
+            logger.info(f"Successfully saved data for {len(results)} results")
+            
+            return [
+                {"animal_id": animal_ids[key], "observation_id": observation_id}
+                for key, observation_id in zip(keys, observation_ids)
+            ]
+        
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error saving batch to database: {str(e)}")
+            raise
+        finally:
+            db.close()
+
+def _hash_file(path: str) -> str:
+    """Get the BLAKE2b hex digest of a file's contents."""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _init_batch_worker():
+    """Load the models once per batch worker process."""
+    get_pipeline().warm_up()
+
+def _process_one(audio_path: str) -> AudioProcessingResult:
+    """Process a single audio file in a batch worker process."""
+    return get_pipeline().process_audio(audio_path)
 
 # Singleton instance
 _pipeline = None
@@ -9,11 +9,30 @@ import logging
 import time
 import json
 from pprint import pprint
-import subprocess
 import webbrowser
 import threading
+import functools
+import gzip
 import http.server
-import socketserver
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:  # Optional; without it requests builds the upload body in memory
+    MultipartEncoder = None
+
+try:
+    import orjson
+    
+    def _dump_report(results):
+        """Serialize report results to indented UTF-8 JSON."""
+        return orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:  # orjson is optional for the demo; fall back to the stdlib encoder
+    def _dump_report(results):
+        """Serialize report results to indented UTF-8 JSON."""
+        return json.dumps(results, ensure_ascii=False, indent=2).encode('utf-8')
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -24,54 +43,110 @@ DEMO_PORT = 8080
 DEMO_HOST = "localhost"
 API_PORT = 8000
 API_HOST = "localhost"
+STATUS_POLL_ATTEMPTS = 30
+STATUS_POLL_INTERVAL = 2
+SERVER_START_TIMEOUT = 10
+SERVER_STOP_TIMEOUT = 5
+SERVER_PROBE_INTERVAL = 0.1
+
+# Shared HTTP session: keeps the API connection alive across upload and status polls
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.2)
+))
+_SESSION.headers.update({'Connection': 'keep-alive'})
 
 def start_server():
-    """Start the Zoo Assistant server."""
+    """Start the Zoo Assistant server on a background thread."""
     logger.info("Starting Zoo Assistant server...")
     
-    # Start the server in a separate process
-    server_process = subprocess.Popen(
-        [sys.executable, "server.py"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
+    # Run the app in this process so it shares the already-initialised interpreter
+    import uvicorn
+    from server import app
     
-    # Wait for the server to start
-    time.sleep(3)
+    server = uvicorn.Server(uvicorn.Config(app, host=API_HOST, port=API_PORT, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
     
-    # Check if the server is running
-    try:
-        import requests
-        response = requests.get(f"http://{API_HOST}:{API_PORT}")
-        if response.status_code == 200:
+    # Wait until startup (model warm-up included) completes, the server dies, or the timeout elapses
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.started:
             logger.info("Server started successfully")
-            return server_process
-        else:
-            logger.error(f"Server returned status code {response.status_code}")
-            server_process.terminate()
+            return server, thread
+        if not thread.is_alive():
+            logger.error("Server exited during startup")
             return None
-    except Exception as e:
-        logger.error(f"Error checking server status: {str(e)}")
-        server_process.terminate()
-        return None
+        time.sleep(SERVER_PROBE_INTERVAL)
+    
+    logger.error(f"Server did not start within {SERVER_START_TIMEOUT} seconds")
+    stop_server(server, thread)
+    return None
+
+def stop_server(server, thread):
+    """Ask the in-process server to shut down and wait for it."""
+    server.should_exit = True
+    thread.join(timeout=SERVER_STOP_TIMEOUT)
+
+def _stream_status(job_id):
+    """Wait for a job to finish via the server's SSE endpoint.
+    
+    Returns NotImplemented when the server has no SSE endpoint.
+    """
+    url = f"http://{API_HOST}:{API_PORT}/api/audio/events/{job_id}"
+    timeout = STATUS_POLL_ATTEMPTS * STATUS_POLL_INTERVAL
+    with _SESSION.get(url, stream=True, headers={'Accept': 'text/event-stream'}, timeout=timeout) as response:
+        if response.status_code == 404:
+            return NotImplemented
+        response.raise_for_status()
+        
+        result = None
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith('data:'):
+                continue
+            result = json.loads(line[5:])
+            logger.info(f"Job status: {result.get('status')}")
+            if result.get('status') in ('completed', 'failed'):
+                break
+        return result
+
+def _poll_status(job_id):
+    """Wait for a job to finish by polling its status."""
+    result = None
+    for attempt in range(STATUS_POLL_ATTEMPTS):
+        logger.info(f"Checking job status (attempt {attempt + 1}/{STATUS_POLL_ATTEMPTS})...")
+        
+        response = _SESSION.get(f"http://{API_HOST}:{API_PORT}/api/audio/status/{job_id}")
+        response.raise_for_status()
+        
+        result = response.json()
+        if result.get('status') in ('completed', 'failed'):
+            break
+        
+        time.sleep(STATUS_POLL_INTERVAL)
+    return result
 
 def process_audio(audio_file):
     """Process an audio file and return the results."""
     logger.info(f"Processing audio file: {audio_file}")
     
     try:
-        import requests
-        
         # Check if file exists
         if not os.path.exists(audio_file):
             logger.error(f"Audio file not found: {audio_file}")
             return None
         
-        # Upload file
+        # Upload file, streaming the multipart body from disk when requests_toolbelt is available
+        url = f"http://{API_HOST}:{API_PORT}/api/audio/process"
         with open(audio_file, 'rb') as f:
-            files = {'file': (os.path.basename(audio_file), f, 'audio/mpeg')}
-            response = requests.post(f"http://{API_HOST}:{API_PORT}/api/audio/process", files=files)
+            field = (os.path.basename(audio_file), f, 'audio/mpeg')
+            if MultipartEncoder is not None:
+                encoder = MultipartEncoder(fields={'file': field})
+                response = _SESSION.post(url, data=encoder, headers={'Content-Type': encoder.content_type})
+            else:
+                response = _SESSION.post(url, files={'file': field})
         
         response.raise_for_status()
         
@@ -82,27 +157,18 @@ def process_audio(audio_file):
             logger.error("No job ID returned")
             return None
         
-        # Poll for status
-        max_attempts = 30
-        interval = 2
+        # Wait for the job to finish, pushed over SSE when the server supports it
+        result = _stream_status(job_id)
+        if result is NotImplemented:
+            result = _poll_status(job_id)
         
-        for attempt in range(max_attempts):
-            logger.info(f"Checking job status (attempt {attempt + 1}/{max_attempts})...")
-            
-            response = requests.get(f"http://{API_HOST}:{API_PORT}/api/audio/status/{job_id}")
-            response.raise_for_status()
-            
-            result = response.json()
-            status = result.get('status')
-            
-            if status == 'completed':
-                logger.info("Processing completed successfully")
-                return result
-            elif status == 'failed':
-                logger.error(f"Processing failed: {result.get('error')}")
-                return None
-            
-            time.sleep(interval)
+        status = result.get('status') if result else None
+        if status == 'completed':
+            logger.info("Processing completed successfully")
+            return result
+        elif status == 'failed':
+            logger.error(f"Processing failed: {result.get('error')}")
+            return None
         
         logger.error("Processing timed out")
         return None
@@ -111,17 +177,8 @@ def process_audio(audio_file):
         logger.error(f"Error processing audio: {str(e)}")
         return None
 
-def create_demo_report(results, output_dir):
-    """Create a demo report from processing results."""
-    logger.info("Creating demo report...")
-    
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Create HTML report
-    html_file = os.path.join(output_dir, "report.html")
-    
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write("""
+# Static report page; it loads report.json from the same directory
+_HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="ru">
 <head>
@@ -300,162 +357,216 @@ def create_demo_report(results, output_dir):
     
     <script>
         // Load report data
-        const reportData = REPORT_DATA_PLACEHOLDER;
+        fetch('report.json').then(response => response.json()).then(reportData => {
         
-        // Update metrics
-        document.getElementById('processing-time').textContent = reportData.processing_time.toFixed(2);
-        document.getElementById('audio-duration').textContent = reportData.audio_duration.toFixed(2);
-        document.getElementById('rtf').textContent = (reportData.processing_time / reportData.audio_duration).toFixed(2);
-        document.getElementById('entity-count').textContent = reportData.entities ? reportData.entities.length : 0;
+            // Update metrics
+            document.getElementById('processing-time').textContent = reportData._processing_time_s;
+            document.getElementById('audio-duration').textContent = reportData._audio_duration_s;
+            document.getElementById('rtf').textContent = reportData._rtf;
+            document.getElementById('entity-count').textContent = reportData._entity_count;
         
-        // Update transcription
-        document.getElementById('transcription').textContent = reportData.transcription || 'Транскрипция не найдена';
+            // Update transcription
+            document.getElementById('transcription').textContent = reportData.transcription || 'Транскрипция не найдена';
         
-        // Update audio player
-        const audioPlayer = document.getElementById('audio-player');
-        audioPlayer.src = reportData.audio_file || '';
+            // Update audio player
+            const audioPlayer = document.getElementById('audio-player');
+            audioPlayer.src = reportData.audio_file || '';
         
-        // Update extracted data
-        const extractedDataElement = document.getElementById('extracted-data');
-        const structuredData = reportData.structured_data;
+            // Update extracted data
+            const extractedDataElement = document.getElementById('extracted-data');
+            const structuredData = reportData.structured_data;
         
-        if (structuredData) {
-            let html = '';
-            
-            // Animal info
-            if (structuredData.name || structuredData.species) {
-                html += `<div class="entity-item">
-                    <div class="entity-type">Животное</div>
-                    <div class="entity-value">
-                        <span>Имя</span>
-                        <span>${structuredData.name || 'Неизвестно'}</span>
-                    </div>
-                    <div class="entity-value">
-                        <span>Вид</span>
-                        <span>${structuredData.species || 'Неизвестно'}</span>
-                    </div>
-                </div>`;
-            }
+            if (structuredData) {
+                let html = '';
             
-            // Measurements
-            const measurements = structuredData.measurements || {};
-            if (measurements.weight || measurements.length || measurements.temperature) {
-                html += `<div class="entity-item">
-                    <div class="entity-type">Измерения</div>`;
-                
-                if (measurements.weight) {
-                    html += `<div class="entity-value">
-                        <span>Вес</span>
-                        <span>${measurements.weight} кг</span>
+                // Animal info
+                if (structuredData.name || structuredData.species) {
+                    html += `<div class="entity-item">
+                        <div class="entity-type">Животное</div>
+                        <div class="entity-value">
+                            <span>Имя</span>
+                            <span>${structuredData.name || 'Неизвестно'}</span>
+                        </div>
+                        <div class="entity-value">
+                            <span>Вид</span>
+                            <span>${structuredData.species || 'Неизвестно'}</span>
+                        </div>
                     </div>`;
                 }
+            
+                // Measurements
+                const measurements = structuredData.measurements || {};
+                if (measurements.weight || measurements.length || measurements.temperature) {
+                    html += `<div class="entity-item">
+                        <div class="entity-type">Измерения</div>`;
                 
-                if (measurements.length) {
-                    html += `<div class="entity-value">
-                        <span>Длина</span>
-                        <span>${measurements.length} м</span>
-                    </div>`;
-                }
+                    if (measurements.weight) {
+                        html += `<div class="entity-value">
+                            <span>Вес</span>
+                            <span>${measurements.weight} кг</span>
+                        </div>`;
+                    }
                 
-                if (measurements.temperature) {
-                    html += `<div class="entity-value">
-                        <span>Температура тела</span>
-                        <span>${measurements.temperature} °C</span>
-                    </div>`;
-                }
+                    if (measurements.length) {
+                        html += `<div class="entity-value">
+                            <span>Длина</span>
+                            <span>${measurements.length} м</span>
+                        </div>`;
+                    }
                 
-                html += `</div>`;
-            }
-            
-            // Behavior and health
-            if (structuredData.behavior || structuredData.health_status) {
-                html += `<div class="entity-item">
-                    <div class="entity-type">Состояние</div>`;
+                    if (measurements.temperature) {
+                        html += `<div class="entity-value">
+                            <span>Температура тела</span>
+                            <span>${measurements.temperature} °C</span>
+                        </div>`;
+                    }
                 
-                if (structuredData.behavior) {
-                    html += `<div class="entity-value">
-                        <span>Поведение</span>
-                        <span>${structuredData.behavior}</span>
-                    </div>`;
+                    html += `</div>`;
                 }
+            
+                // Behavior and health
+                if (structuredData.behavior || structuredData.health_status) {
+                    html += `<div class="entity-item">
+                        <div class="entity-type">Состояние</div>`;
                 
-                if (structuredData.health_status) {
-                    html += `<div class="entity-value">
-                        <span>Здоровье</span>
-                        <span>${structuredData.health_status}</span>
-                    </div>`;
-                }
+                    if (structuredData.behavior) {
+                        html += `<div class="entity-value">
+                            <span>Поведение</span>
+                            <span>${structuredData.behavior}</span>
+                        </div>`;
+                    }
                 
-                html += `</div>`;
-            }
-            
-            // Feeding
-            const feeding = structuredData.feeding || {};
-            if (feeding.food_type || feeding.quantity) {
-                html += `<div class="entity-item">
-                    <div class="entity-type">Кормление</div>`;
+                    if (structuredData.health_status) {
+                        html += `<div class="entity-value">
+                            <span>Здоровье</span>
+                            <span>${structuredData.health_status}</span>
+                        </div>`;
+                    }
                 
-                if (feeding.food_type) {
-                    html += `<div class="entity-value">
-                        <span>Тип пищи</span>
-                        <span>${feeding.food_type}</span>
-                    </div>`;
+                    html += `</div>`;
                 }
+            
+                // Feeding
+                const feeding = structuredData.feeding || {};
+                if (feeding.food_type || feeding.quantity) {
+                    html += `<div class="entity-item">
+                        <div class="entity-type">Кормление</div>`;
                 
-                if (feeding.quantity) {
-                    html += `<div class="entity-value">
-                        <span>Количество</span>
-                        <span>${feeding.quantity} кг</span>
-                    </div>`;
-                }
+                    if (feeding.food_type) {
+                        html += `<div class="entity-value">
+                            <span>Тип пищи</span>
+                            <span>${feeding.food_type}</span>
+                        </div>`;
+                    }
                 
-                html += `</div>`;
-            }
-            
-            // Environment
-            const environment = structuredData.environment || {};
-            if (environment.temperature || environment.humidity) {
-                html += `<div class="entity-item">
-                    <div class="entity-type">Окружающая среда</div>`;
+                    if (feeding.quantity) {
+                        html += `<div class="entity-value">
+                            <span>Количество</span>
+                            <span>${feeding.quantity} кг</span>
+                        </div>`;
+                    }
                 
-                if (environment.temperature) {
-                    html += `<div class="entity-value">
-                        <span>Температура</span>
-                        <span>${environment.temperature} °C</span>
-                    </div>`;
+                    html += `</div>`;
                 }
+            
+                // Environment
+                const environment = structuredData.environment || {};
+                if (environment.temperature || environment.humidity) {
+                    html += `<div class="entity-item">
+                        <div class="entity-type">Окружающая среда</div>`;
                 
-                if (environment.humidity) {
-                    html += `<div class="entity-value">
-                        <span>Влажность</span>
-                        <span>${environment.humidity}%</span>
-                    </div>`;
-                }
+                    if (environment.temperature) {
+                        html += `<div class="entity-value">
+                            <span>Температура</span>
+                            <span>${environment.temperature} °C</span>
+                        </div>`;
+                    }
                 
-                html += `</div>`;
-            }
+                    if (environment.humidity) {
+                        html += `<div class="entity-value">
+                            <span>Влажность</span>
+                            <span>${environment.humidity}%</span>
+                        </div>`;
+                    }
+                
+                    html += `</div>`;
+                }
             
-            if (html === '') {
-                html = '<div class="loading">Структурированные данные не найдены</div>';
-            }
+                if (html === '') {
+                    html = '<div class="loading">Структурированные данные не найдены</div>';
+                }
             
-            extractedDataElement.innerHTML = html;
-        } else {
-            extractedDataElement.innerHTML = '<div class="loading">Структурированные данные не найдены</div>';
-        }
+                extractedDataElement.innerHTML = html;
+            } else {
+                extractedDataElement.innerHTML = '<div class="loading">Структурированные данные не найдены</div>';
+            }
+        });
     </script>
 </body>
 </html>
-""".replace("REPORT_DATA_PLACEHOLDER", json.dumps(results)))
+"""
+_HTML_PAGE = _HTML_TEMPLATE.encode('utf-8')
+_HTML_PAGE_GZ = gzip.compress(_HTML_PAGE, mtime=0)
+
+def _write_with_gzip(path, data, compressed):
+    """Write a file plus a pre-compressed `.gz` sibling for the demo server to send."""
+    with open(path, 'wb') as f:
+        f.write(data)
+    with open(path + '.gz', 'wb') as f:
+        f.write(compressed)
+
+def write_json_report(results, output_dir):
+    """Write processing results to report.json and return its path."""
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Pre-format the summary metrics so the page only has to insert them
+    processing_time = results.get('processing_time') or 0.0
+    audio_duration = results.get('audio_duration') or 0.0
+    results['_processing_time_s'] = f"{processing_time:.2f}"
+    results['_audio_duration_s'] = f"{audio_duration:.2f}"
+    results['_rtf'] = f"{processing_time / audio_duration:.2f}" if audio_duration else "—"
+    results['_entity_count'] = len(results.get('entities') or ())
     
-    # Create JSON report
     json_file = os.path.join(output_dir, "report.json")
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    data = _dump_report(results)
+    _write_with_gzip(json_file, data, gzip.compress(data, mtime=0))
+    
+    logger.info(f"JSON report written to {json_file}")
+    return json_file
+
+def write_html_report(output_dir):
+    """Write the report page, which renders report.json from the same directory, and return its path."""
+    os.makedirs(output_dir, exist_ok=True)
+    
+    html_file = os.path.join(output_dir, "report.html")
+    _write_with_gzip(html_file, _HTML_PAGE, _HTML_PAGE_GZ)
     
     logger.info(f"Report created at {html_file}")
     return html_file
 
+class _ReportHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler that keeps connections alive and serves pre-gzipped files."""
+    protocol_version = "HTTP/1.1"
+    
+    def send_head(self):
+        """Send a file's `.gz` sibling when the client accepts gzip, else fall back to the default."""
+        path = self.translate_path(self.path)
+        if 'gzip' not in self.headers.get('Accept-Encoding', '') or not os.path.isfile(path + '.gz'):
+            return super().send_head()
+        
+        try:
+            f = open(path + '.gz', 'rb')
+        except OSError:
+            return super().send_head()
+        
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return f
+
 def start_demo_server(html_file):
     """Start a simple HTTP server to serve the demo report."""
     logger.info(f"Starting demo server on http://{DEMO_HOST}:{DEMO_PORT}")
@@ -463,12 +574,10 @@ def start_demo_server(html_file):
     # Get the directory containing the HTML file
     directory = os.path.dirname(os.path.abspath(html_file))
     
-    # Change to that directory
-    os.chdir(directory)
-    
-    # Create a simple HTTP server
-    handler = http.server.SimpleHTTPRequestHandler
-    httpd = socketserver.TCPServer((DEMO_HOST, DEMO_PORT), handler)
+    # Serve the page and its assets from that directory, concurrently over keep-alive connections
+    handler = functools.partial(_ReportHandler, directory=directory)
+    httpd = http.server.ThreadingHTTPServer((DEMO_HOST, DEMO_PORT), handler)
+    httpd.daemon_threads = True
     
     # Start the server in a separate thread
     server_thread = threading.Thread(target=httpd.serve_forever)
@@ -483,15 +592,15 @@ def main():
     parser.add_argument('--audio', required=True, help='Audio file to process')
     parser.add_argument('--output-dir', default='demo_output', help='Output directory for demo files')
     parser.add_argument('--no-server', action='store_true', help='Do not start the Zoo Assistant server')
-    parser.add_argument('--no-browser', action='store_true', help='Do not open the browser')
+    parser.add_argument('--no-browser', action='store_true', help='Only write report.json; do not serve or open the HTML report')
     
     args = parser.parse_args()
     
     # Start the server if needed
-    server_process = None
+    api_server = None
     if not args.no_server:
-        server_process = start_server()
-        if not server_process:
+        api_server = start_server()
+        if not api_server:
             logger.error("Failed to start server")
             sys.exit(1)
     
@@ -506,30 +615,38 @@ def main():
         results['audio_file'] = os.path.basename(args.audio)
         
         # Create demo report
-        html_file = create_demo_report(results, args.output_dir)
+        write_json_report(results, args.output_dir)
+        
+        # Headless runs only need the JSON results
+        if args.no_browser:
+            return
+        
+        html_file = write_html_report(args.output_dir)
         
         # Start demo server
         demo_server = start_demo_server(html_file)
         
-        # Open browser
-        if not args.no_browser:
-            url = f"http://{DEMO_HOST}:{DEMO_PORT}/{os.path.basename(html_file)}"
-            logger.info(f"Opening browser at {url}")
-            webbrowser.open(url)
+        # Open browser. The server socket is already listening, so the page can't be
+        # refused; launch off the main thread since some launchers block until the app starts.
+        url = f"http://{DEMO_HOST}:{DEMO_PORT}/{os.path.basename(html_file)}"
+        logger.info(f"Opening browser at {url}")
+        threading.Thread(target=webbrowser.open, args=(url,), kwargs={'new': 2, 'autoraise': False}, daemon=True).start()
         
-        # Keep the script running
+        # Keep the script running; block without waking until Ctrl+C interrupts the wait
         logger.info("Press Ctrl+C to exit")
-        while True:
-            time.sleep(1)
+        threading.Event().wait()
     
     except KeyboardInterrupt:
         logger.info("Exiting...")
     
     finally:
         # Stop the server if we started it
-        if server_process:
+        if api_server:
             logger.info("Stopping server...")
-            server_process.terminate()
+            stop_server(*api_server)
+        
+        # Release pooled API connections
+        _SESSION.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
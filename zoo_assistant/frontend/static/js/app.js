@@ -694,8 +694,12 @@ function viewObservation(id) {
 }
 
 function playAudio(filename) {
-    // Play audio file (to be implemented)
-    alert(`Воспроизведение аудио: ${filename}`);
+    // Play audio file
+    const audio = new Audio(`${API_URL}/api/audio/files/${encodeURIComponent(filename)}`);
+    audio.play().catch(error => {
+        console.error('Error:', error);
+        alert(`Не удалось воспроизвести аудио: ${filename}`);
+    });
 }
 
 // Initialize the app
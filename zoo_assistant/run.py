@@ -6,7 +6,7 @@ import os
 import argparse
 import logging
 import sys
-import subprocess
+import shutil
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -14,13 +14,12 @@ logger = logging.getLogger(__name__)
 
 def check_dependencies():
     """Check if all required dependencies are installed."""
-    try:
-        # Check if ffmpeg is installed
-        subprocess.run(['ffmpeg', '-version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        logger.info("FFmpeg is installed")
-    except FileNotFoundError:
+    # Check if ffmpeg is installed (a PATH lookup, no need to run it)
+    ffmpeg_path = shutil.which('ffmpeg')
+    if ffmpeg_path is None:
         logger.error("FFmpeg is not installed. Please install it before running the application.")
         return False
+    logger.info(f"FFmpeg is installed at {ffmpeg_path}")
     
     # Check if Vosk model exists
     model_path = os.path.join('core_engine', 'asr', 'models', 'vosk-model-ru')
@@ -34,10 +33,12 @@ def init_database():
     """Initialize the database."""
     logger.info("Initializing database...")
     try:
-        subprocess.run([sys.executable, 'init_db.py'], check=True)
+        # Only needed with --init-db, so import on demand
+        from init_db import init_db
+        init_db()
         logger.info("Database initialized successfully")
         return True
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         return False
 
@@ -48,13 +49,10 @@ def run_server(host='0.0.0.0', port=8000, debug=False):
     # Create data directories if they don't exist
     os.makedirs(os.path.join('data', 'uploads'), exist_ok=True)
     
-    # Run the server
-    cmd = [sys.executable, 'server.py']
-    if debug:
-        cmd.append('--debug')
-    
+    # Run the server in this process
+    import uvicorn
     try:
-        subprocess.run(cmd)
+        uvicorn.run("server:app", host=host, port=port, reload=debug)
     except KeyboardInterrupt:
         logger.info("Server stopped")
 
@@ -7,7 +7,7 @@ from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import our backend API
-from backend.api.main import app as api_app
+from backend.api.main import app as api_app, CORS_ORIGINS, warm_pipeline
 
 # Create main app
 app = FastAPI(
@@ -19,10 +19,12 @@ app = FastAPI(
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
+    max_age=86400,
 )
 
 # Mount static files
@@ -34,6 +36,9 @@ templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), "f
 # Mount API
 app.mount("/api", api_app)
 
+# Mounted apps don't receive startup events, so warm the pipeline from here
+app.add_event_handler("startup", warm_pipeline)
+
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """Serve the main frontend page."""
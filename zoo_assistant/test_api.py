@@ -6,9 +6,30 @@ import os
 import sys
 import argparse
 import logging
+import time
+import random
+import threading
 import requests
-import json
-from pprint import pprint
+from requests.adapters import HTTPAdapter
+from pprint import pformat
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from cachetools import TTLCache
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+try:
+    import ijson
+except ImportError:  # Optional; without it list responses are parsed in one piece
+    ijson = None
+
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:  # Optional; without it requests builds the upload body in memory
+    MultipartEncoder = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -17,19 +38,72 @@ logger = logging.getLogger(__name__)
 # Default API URL
 DEFAULT_API_URL = 'http://localhost:8000/api'
 
+# Shared HTTP session so every endpoint test and status poll reuses pooled connections
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20)
+_SESSION.mount('http://', _adapter)
+_SESSION.mount('https://', _adapter)
+_SESSION.headers['Connection'] = 'keep-alive'
+
+# Short-lived memo of idempotent, fully-read GET responses, so scripted runs that
+# call main() repeatedly don't re-fetch the same resource within the TTL
+GET_CACHE_TTL = 5.0  # seconds
+_get_cache = TTLCache(maxsize=64, ttl=GET_CACHE_TTL)
+_get_cache_lock = threading.Lock()
+
+def _cached_get(url):
+    """GET `url` through the shared session, reusing a successful response fetched within the TTL."""
+    with _get_cache_lock:
+        response = _get_cache.get(url)
+    if response is None:
+        response = _SESSION.get(url)
+        if response.ok:
+            with _get_cache_lock:
+                _get_cache[url] = response
+    return response
+
+class _Pretty:
+    """Pretty-printed view of an object, formatted only if a log record is emitted."""
+    __slots__ = ('obj',)
+    
+    def __init__(self, obj):
+        self.obj = obj
+    
+    def __str__(self):
+        return pformat(self.obj)
+
+def _scan_list(response):
+    """First element and length of a JSON array response, streamed item by item when ijson is available."""
+    if ijson is None:
+        result = json_loads(response.content)
+        return (result[0] if result else None), len(result)
+    
+    # Let urllib3 undo the gzip content encoding before ijson reads the raw stream
+    response.raw.decode_content = True
+    items = ijson.items(response.raw, 'item', use_float=True)
+    first = next(items, None)
+    return first, (first is not None) + sum(1 for _ in items)
+
+def _total_count(response, default):
+    """Total item count reported in the X-Total-Count header, or `default` if absent."""
+    try:
+        return int(response.headers['X-Total-Count'])
+    except (KeyError, ValueError):
+        return default
+
 def test_root(api_url):
     """Test the root endpoint."""
     url = api_url.rstrip('/api')
     logger.info(f"Testing root endpoint: {url}")
     
     try:
-        response = requests.get(url)
+        response = _cached_get(url)
         response.raise_for_status()
         
         logger.info(f"Status code: {response.status_code}")
         logger.info(f"Response: {response.text}")
         
-        return response.json()
+        return json_loads(response.content)
     
     except Exception as e:
         logger.error(f"Error testing root endpoint: {str(e)}")
@@ -46,22 +120,26 @@ def test_audio_process(api_url, audio_file):
             logger.error(f"Audio file not found: {audio_file}")
             return None
         
-        # Upload file
+        # Upload file, streaming the multipart body from disk when requests_toolbelt is available
         with open(audio_file, 'rb') as f:
-            files = {'file': (os.path.basename(audio_file), f, 'audio/mpeg')}
-            response = requests.post(url, files=files)
+            field = (os.path.basename(audio_file), f, 'audio/mpeg')
+            if MultipartEncoder is not None:
+                encoder = MultipartEncoder(fields={'file': field})
+                response = _SESSION.post(url, data=encoder, headers={'Content-Type': encoder.content_type})
+            else:
+                response = _SESSION.post(url, files={'file': field})
         
         response.raise_for_status()
         
         logger.info(f"Status code: {response.status_code}")
-        result = response.json()
+        result = json_loads(response.content)
         logger.info(f"Job ID: {result.get('id')}")
         logger.info(f"Status: {result.get('status')}")
         
-        # Poll for status
+        # Poll for status at the pace the server asks for
         job_id = result.get('id')
         if job_id:
-            poll_status(api_url, job_id)
+            poll_status(api_url, job_id, interval=_retry_after(response, default=2))
         
         return result
     
@@ -69,44 +147,55 @@ def test_audio_process(api_url, audio_file):
         logger.error(f"Error testing audio processing endpoint: {str(e)}")
         return None
 
-def poll_status(api_url, job_id, max_attempts=30, interval=2):
-    """Poll for job status."""
+def _retry_after(response, default):
+    """Seconds to wait according to the response's Retry-After header, or `default`."""
+    try:
+        return float(response.headers['Retry-After'])
+    except (KeyError, ValueError):
+        return default
+
+def poll_status(api_url, job_id, max_attempts=30, interval=2, base_delay=0.1):
+    """Poll for job status, backing off exponentially from `base_delay` up to `interval` seconds.
+    
+    Gives up after the same `max_attempts * interval` seconds a fixed-interval poll would take.
+    """
     url = f"{api_url}/audio/status/{job_id}"
     logger.info(f"Polling job status: {url}")
     
-    for attempt in range(max_attempts):
+    deadline = time.monotonic() + max_attempts * interval
+    delay = base_delay
+    attempt = 0
+    while time.monotonic() < deadline:
+        attempt += 1
         try:
-            response = requests.get(url)
+            response = _SESSION.get(url)
             response.raise_for_status()
             
-            result = response.json()
+            result = json_loads(response.content)
             status = result.get('status')
             
-            logger.info(f"Attempt {attempt + 1}/{max_attempts}: Status = {status}")
+            logger.info(f"Attempt {attempt}: Status = {status}")
             
             if status == 'completed':
                 logger.info("Job completed successfully")
                 logger.info(f"Transcription: {result.get('transcription')}")
                 logger.info(f"Processing time: {result.get('processing_time')} seconds")
                 logger.info(f"Found {len(result.get('entities', []))} entities")
-                logger.info("Structured data:")
-                pprint(result.get('structured_data'))
+                logger.info("Structured data:\n%s", _Pretty(result.get('structured_data')))
                 return result
             
             elif status == 'failed':
                 logger.error(f"Job failed: {result.get('error')}")
                 return result
-            
-            # Wait before next attempt
-            import time
-            time.sleep(interval)
         
         except Exception as e:
             logger.error(f"Error polling job status: {str(e)}")
-            import time
-            time.sleep(interval)
+        
+        # Wait before next attempt, with jitter so concurrent pollers don't synchronise
+        time.sleep(delay * (0.5 + random.random()))
+        delay = min(interval, delay * 2)
     
-    logger.error(f"Max polling attempts reached, job still processing")
+    logger.error(f"Polling timed out, job still processing")
     return None
 
 def test_transcriptions(api_url):
@@ -115,18 +204,19 @@ def test_transcriptions(api_url):
     logger.info(f"Testing transcriptions endpoint: {url}")
     
     try:
-        response = requests.get(url)
+        # One row is enough for the sample; the total comes from X-Total-Count
+        response = _SESSION.get(url, params={'limit': 1}, stream=True)
         response.raise_for_status()
         
         logger.info(f"Status code: {response.status_code}")
-        result = response.json()
-        logger.info(f"Found {len(result)} transcriptions")
+        first, count = _scan_list(response)
+        count = _total_count(response, count)
+        logger.info(f"Found {count} transcriptions")
         
-        if result:
-            logger.info("First transcription:")
-            pprint(result[0])
+        if count:
+            logger.info("First transcription:\n%s", _Pretty(first))
         
-        return result
+        return count
     
     except Exception as e:
         logger.error(f"Error testing transcriptions endpoint: {str(e)}")
@@ -138,18 +228,17 @@ def test_animals(api_url):
     logger.info(f"Testing animals endpoint: {url}")
     
     try:
-        response = requests.get(url)
+        response = _SESSION.get(url, stream=True)
         response.raise_for_status()
         
         logger.info(f"Status code: {response.status_code}")
-        result = response.json()
-        logger.info(f"Found {len(result)} animals")
+        first, count = _scan_list(response)
+        logger.info(f"Found {count} animals")
         
-        if result:
-            logger.info("First animal:")
-            pprint(result[0])
+        if count:
+            logger.info("First animal:\n%s", _Pretty(first))
         
-        return result
+        return count
     
     except Exception as e:
         logger.error(f"Error testing animals endpoint: {str(e)}")
@@ -161,13 +250,12 @@ def test_animal_details(api_url, animal_id):
     logger.info(f"Testing animal details endpoint: {url}")
     
     try:
-        response = requests.get(url)
+        response = _cached_get(url)
         response.raise_for_status()
         
         logger.info(f"Status code: {response.status_code}")
-        result = response.json()
-        logger.info(f"Animal details:")
-        pprint(result)
+        result = json_loads(response.content)
+        logger.info("Animal details:\n%s", _Pretty(result))
         
         return result
     
@@ -181,18 +269,19 @@ def test_animal_log(api_url, animal_id):
     logger.info(f"Testing animal log endpoint: {url}")
     
     try:
-        response = requests.get(url)
+        # One row is enough for the sample; the total comes from X-Total-Count
+        response = _SESSION.get(url, params={'limit': 1}, stream=True)
         response.raise_for_status()
         
         logger.info(f"Status code: {response.status_code}")
-        result = response.json()
-        logger.info(f"Found {len(result)} log entries")
+        first, count = _scan_list(response)
+        count = _total_count(response, count)
+        logger.info(f"Found {count} log entries")
         
-        if result:
-            logger.info("First log entry:")
-            pprint(result[0])
+        if count:
+            logger.info("First log entry:\n%s", _Pretty(first))
         
-        return result
+        return count
     
     except Exception as e:
         logger.error(f"Error testing animal log endpoint: {str(e)}")
@@ -207,11 +296,11 @@ def test_daily_report(api_url, date=None):
     logger.info(f"Testing daily report endpoint: {url}")
     
     try:
-        response = requests.get(url)
+        response = _cached_get(url)
         response.raise_for_status()
         
         logger.info(f"Status code: {response.status_code}")
-        result = response.json()
+        result = json_loads(response.content)
         logger.info(f"Report date: {result.get('date')}")
         logger.info(f"Observations: {result.get('observations_count')}")
         logger.info(f"Measurements: {result.get('measurements_count')}")
@@ -229,16 +318,15 @@ def test_entity_configs(api_url):
     logger.info(f"Testing entity configs endpoint: {url}")
     
     try:
-        response = requests.get(url)
+        response = _cached_get(url)
         response.raise_for_status()
         
         logger.info(f"Status code: {response.status_code}")
-        result = response.json()
+        result = json_loads(response.content)
         logger.info(f"Found {len(result)} entity configs")
         
         if result:
-            logger.info("Entity configs:")
-            pprint(result)
+            logger.info("Entity configs:\n%s", _Pretty(result))
         
         return result
     
@@ -246,6 +334,27 @@ def test_entity_configs(api_url):
         logger.error(f"Error testing entity configs endpoint: {str(e)}")
         return None
 
+# Endpoint name -> (test function, argparse attribute passed as its second argument, required)
+ENDPOINT_TESTS = {
+    'root': (test_root, None, False),
+    'audio': (test_audio_process, 'audio', True),
+    'transcriptions': (test_transcriptions, None, False),
+    'animals': (test_animals, None, False),
+    'animal-details': (test_animal_details, 'animal_id', True),
+    'animal-log': (test_animal_log, 'animal_id', True),
+    'daily-report': (test_daily_report, 'date', False),
+    'entity-configs': (test_entity_configs, None, False),
+}
+
+# Endpoints checked by --endpoint all; they are read-only and independent of each other
+ALL_ENDPOINTS = ('root', 'transcriptions', 'animals', 'daily-report', 'entity-configs')
+
+@lru_cache(maxsize=8)
+def _canon_api_url(url):
+    """Normalize an API base URL to end in `/api` without a trailing slash."""
+    url = url.rstrip('/')
+    return url if url.endswith('/api') else url + '/api'
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description='Test Zoo Assistant API functionality')
@@ -253,50 +362,35 @@ def main():
     parser.add_argument('--audio', help='Path to audio file for testing')
     parser.add_argument('--animal-id', type=int, help='Animal ID for testing')
     parser.add_argument('--date', help='Date for daily report (YYYY-MM-DD)')
-    parser.add_argument('--endpoint', choices=['root', 'audio', 'transcriptions', 'animals', 
-                                              'animal-details', 'animal-log', 'daily-report', 
-                                              'entity-configs', 'all'], 
+    parser.add_argument('--endpoint', choices=[*ENDPOINT_TESTS, 'all'],
                         default='all', help='Endpoint to test (default: all)')
     
     args = parser.parse_args()
     
     # Normalize API URL
-    api_url = args.api_url.rstrip('/')
-    if not api_url.endswith('/api'):
-        api_url += '/api'
+    api_url = _canon_api_url(args.api_url)
     
-    if args.endpoint == 'root' or args.endpoint == 'all':
-        test_root(api_url)
-    
-    if args.endpoint == 'audio':
-        if not args.audio:
-            logger.error("Audio file is required for audio endpoint testing")
-            sys.exit(1)
-        test_audio_process(api_url, args.audio)
-    
-    if args.endpoint == 'transcriptions' or args.endpoint == 'all':
-        test_transcriptions(api_url)
-    
-    if args.endpoint == 'animals' or args.endpoint == 'all':
-        test_animals(api_url)
-    
-    if args.endpoint == 'animal-details':
-        if not args.animal_id:
-            logger.error("Animal ID is required for animal details endpoint testing")
-            sys.exit(1)
-        test_animal_details(api_url, args.animal_id)
-    
-    if args.endpoint == 'animal-log':
-        if not args.animal_id:
-            logger.error("Animal ID is required for animal log endpoint testing")
+    # Resolve the tests to run and their arguments
+    calls = []
+    for name in (ALL_ENDPOINTS if args.endpoint == 'all' else (args.endpoint,)):
+        test, attr, required = ENDPOINT_TESTS[name]
+        extra = () if attr is None else (getattr(args, attr),)
+        if required and not extra[0]:
+            logger.error(f"--{attr.replace('_', '-')} is required for {name} endpoint testing")
             sys.exit(1)
-        test_animal_log(api_url, args.animal_id)
+        calls.append((test, extra))
     
-    if args.endpoint == 'daily-report' or args.endpoint == 'all':
-        test_daily_report(api_url, args.date)
+    try:
+        # The tests are independent, so issue them concurrently over the shared
+        # session; wall time is the slowest endpoint, not the sum
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            futures = [executor.submit(test, api_url, *extra) for test, extra in calls]
+            for future in futures:
+                future.result()
     
-    if args.endpoint == 'entity-configs' or args.endpoint == 'all':
-        test_entity_configs(api_url)
+    finally:
+        # Release pooled connections
+        _SESSION.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
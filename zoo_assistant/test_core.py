@@ -7,12 +7,32 @@ import sys
 import argparse
 import logging
 import time
-from pprint import pprint
+from pprint import pformat
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class _Pretty:
+    """Pretty-printed view of an object, formatted only if a log record is emitted."""
+    __slots__ = ('obj',)
+    
+    def __init__(self, obj):
+        self.obj = obj
+    
+    def __str__(self):
+        return pformat(self.obj)
+
+def _prefetch(path):
+    """Ask the kernel to start reading `path` into the page cache in the background."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
 def test_asr(audio_file):
     """Test the ASR (Automatic Speech Recognition) component."""
     logger.info(f"Testing ASR with audio file: {audio_file}")
@@ -20,16 +40,19 @@ def test_asr(audio_file):
     try:
         from core_engine.asr.speech_recognition import get_recognizer
         
+        # Read the audio ahead while the models load
+        _prefetch(audio_file)
+        
         # Get the recognizer
         recognizer = get_recognizer()
         
         # Process the audio file
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         result = recognizer.process_audio(audio_file)
-        end_time = time.time()
+        end_time = time.perf_counter_ns()
         
         # Print results
-        logger.info(f"ASR completed in {end_time - start_time:.2f} seconds")
+        logger.info(f"ASR completed in {(end_time - start_time) / 1e9:.2f} seconds")
         logger.info(f"Audio duration: {result.audio_duration:.2f} seconds")
         logger.info(f"Processing time: {result.processing_time:.2f} seconds")
         logger.info(f"Real-time factor: {result.processing_time / result.audio_duration:.2f}x")
@@ -52,25 +75,24 @@ def test_ner(text):
         extractor = get_extractor()
         
         # Extract entities
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         entities = extractor.extract_entities(text)
-        end_time = time.time()
+        end_time = time.perf_counter_ns()
         
         # Print results
-        logger.info(f"NER completed in {end_time - start_time:.2f} seconds")
+        logger.info(f"NER completed in {(end_time - start_time) / 1e9:.2f} seconds")
         logger.info(f"Found {len(entities)} entities")
         
         for entity in entities:
             logger.info(f"Entity: {entity.text} ({entity.type})")
         
         # Extract structured data
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         structured_data = extractor.extract_animal_info(text)
-        end_time = time.time()
+        end_time = time.perf_counter_ns()
         
-        logger.info(f"Structured data extraction completed in {end_time - start_time:.2f} seconds")
-        logger.info("Structured data:")
-        pprint(structured_data)
+        logger.info(f"Structured data extraction completed in {(end_time - start_time) / 1e9:.2f} seconds")
+        logger.info("Structured data:\n%s", _Pretty(structured_data))
         
         return structured_data
     
@@ -85,25 +107,26 @@ def test_pipeline(audio_file):
     try:
         from core_engine.processing_pipeline import get_pipeline
         
+        # Read the audio ahead while the models load
+        _prefetch(audio_file)
+        
         # Get the pipeline
         pipeline = get_pipeline()
         
         # Process the audio file
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         result = pipeline.process_audio(audio_file)
-        end_time = time.time()
+        end_time = time.perf_counter_ns()
         
         # Print results
-        logger.info(f"Pipeline completed in {end_time - start_time:.2f} seconds")
+        logger.info(f"Pipeline completed in {(end_time - start_time) / 1e9:.2f} seconds")
         logger.info(f"Audio duration: {result.audio_duration:.2f} seconds")
         logger.info(f"Processing time: {result.processing_time:.2f} seconds")
         logger.info(f"Real-time factor: {result.processing_time / result.audio_duration:.2f}x")
         logger.info(f"Transcription: {result.transcription}")
         logger.info(f"Found {len(result.entities)} entities")
-        logger.info("Structured data:")
-        pprint(result.structured_data)
-        logger.info("Database records:")
-        pprint(result.db_records)
+        logger.info("Structured data:\n%s", _Pretty(result.structured_data))
+        logger.info("Database records:\n%s", _Pretty(result.db_records))
         
         return result
     